@@ -4,17 +4,18 @@ from tkinter import font as tkFont
 import threading
 from pystray import MenuItem as item
 import pystray
-from PIL import Image, ImageDraw, ImageTk
+from PIL import Image, ImageTk
 import ctypes
-import gc
+import functools
 import queue
 import tracemalloc
+import weakref
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 
-from worker import BackgroundWorker
+from worker import BackgroundWorker, WorkerQueue, make_source_id
 from logger import logger
 from config import config_manager
-from settings_window import SettingsWindow
-from properties_window import PropertiesWindow
 
 def set_dpi_awareness():
     try:
@@ -25,11 +26,105 @@ def set_dpi_awareness():
         except (AttributeError, OSError):
             logger.log_warning("无法设置DPI感知。")
 
+FONT_NORMAL = ('Segoe UI', 10)
+FONT_BOLD = ('Segoe UI', 10, 'bold')
+
+def _style_init(root):
+    """
+    配置全局的 ttk 主题与样式。样式数据库由整个解释器共享，
+    因此只在启动时调用一次，各窗口打开时无需再配置。
+    """
+    style = ttk.Style(root)
+    try:
+        # 'clam' or 'alt' themes are more customizable
+        style.theme_use('clam')
+    except tk.TclError:
+        # Fallback to default if 'clam' is not available
+        style.theme_use('default')
+
+    style.configure('.', background='white', foreground='black', font=FONT_NORMAL)
+    style.configure('TFrame', background='white')
+    style.configure('TLabel', background='white')
+    style.configure('Bold.TLabel', font=FONT_BOLD)
+    style.configure('TProgressbar', troughcolor='#EAEAEA', background='#0078D7')
+    style.configure('TButton', font=FONT_NORMAL, padding=5)
+    style.map('TButton', background=[('active', '#E5F1FB')])
+    # 设置窗口的白名单列表，行高需容纳 32px 图标
+    style.configure('Whitelist.Treeview', rowheight=36)
+
+# 托盘图标的 (宽, 高, 背景色, 前景色)
+TRAY_ICON_SPEC = (64, 64, 'black', 'white')
+
+@functools.lru_cache(maxsize=None)
+def create_tray_image(width, height, color1, color2):
+    """绘制托盘图标。结果会被缓存，重复创建托盘时无需再次绘制。"""
+    from PIL import ImageDraw
+    image = Image.new('RGB', (width, height), color1)
+    dc = ImageDraw.Draw(image)
+    dc.rectangle((width // 2, 0, width, height // 2), fill=color2)
+    dc.rectangle((0, height // 2, width // 2, height), fill=color2)
+    return image
+
+def prepare_icon_image(icon, icon_size):
+    """将源图标缩放并居中到 icon_size 的正方形RGBA图像。仅涉及PIL，可在后台线程中调用。"""
+    img_copy = icon.copy()
+    # 32px 级别的小图标无需 LANCZOS；缩小 2 倍以上时 BOX 更快且效果相同
+    if max(icon.size) >= 2 * icon_size:
+        resample = Image.Resampling.BOX
+    else:
+        resample = Image.Resampling.BILINEAR
+    img_copy.thumbnail((icon_size, icon_size), resample)
+
+    if img_copy.size == (icon_size, icon_size) and img_copy.mode == "RGBA":
+        # 缩放后已是目标尺寸，无需再分配画布并居中粘贴
+        return img_copy
+
+    final_image = Image.new("RGBA", (icon_size, icon_size), (0, 0, 0, 0))
+    paste_x = (icon_size - img_copy.width) // 2
+    paste_y = (icon_size - img_copy.height) // 2
+    final_image.paste(img_copy, (paste_x, paste_y))
+    return final_image
+
 
 # =====================================================================================
 # UI Components
 # =====================================================================================
 
+# 播放状态对应的 (显示文本, 颜色)；非播放状态一律显示为已暂停
+_PAUSED_STATUS_DISPLAY = ("⏸️ 已暂停", "orange")
+_STATUS_DISPLAY = {
+    'Playing': ("▶️ 播放中", "green"),
+    'Paused': _PAUSED_STATUS_DISPLAY,
+}
+
+class PhotoImageCache:
+    """
+    跨列表重建共享的 PhotoImage LRU 缓存，键为 (sid, icon_size, id(icon))。
+    淘汰时显式删除引用，使Tk能及时释放对应的图像。
+    """
+    def __init__(self, maxsize=64):
+        self.maxsize = maxsize
+        self._items = OrderedDict()
+
+    def get(self, key, icon):
+        item = self._items.get(key)
+        # 同时校验源图标本身，防止 id 复用导致误命中
+        if item is None or item[0] is not icon:
+            return None
+        self._items.move_to_end(key)
+        return item[1]
+
+    def put(self, key, icon, photo):
+        self._items[key] = (icon, photo)
+        self._items.move_to_end(key)
+        while len(self._items) > self.maxsize:
+            oldest_key = next(iter(self._items))
+            del self._items[oldest_key]
+
+    def clear(self):
+        for key in list(self._items):
+            del self._items[key]
+
 class StatusBar(tk.Frame):
     """显示全局状态信息的状态栏。"""
     def __init__(self, parent):
@@ -57,13 +152,40 @@ class AppEntry(tk.Frame):
     一个自定义控件，用于在GUI中显示单个应用程序的信息。
     包含一个图标、应用名称、播放状态和一个选择按钮。
     """
-    def __init__(self, parent, app_info, on_select_callback, on_control_callback):
+    BASE_ICON_SIZE = 32
+    # Tk 缩放因子及对应的图标尺寸由主窗口统一设置，避免每次更新都查询Tcl
+    _tk_scaling = 1.0
+    _icon_size = BASE_ICON_SIZE
+
+    @classmethod
+    def set_scaling(cls, scaling_factor):
+        """更新共享的缩放因子；仅在缩放因子变化时重新计算图标尺寸。"""
+        if scaling_factor == cls._tk_scaling:
+            return False
+        cls._tk_scaling = scaling_factor
+        cls._icon_size = int(cls.BASE_ICON_SIZE * scaling_factor)
+        return True
+
+    def __init__(self, parent, app_info, on_select_callback, on_control_callback, icon_loader=None, photo_cache=None, context_menu_callback=None):
         super().__init__(parent, bg="white", highlightbackground="#e0e0e0", highlightthickness=1)
         self.app_info = app_info
         self.on_select_callback = on_select_callback
         self.on_control_callback = on_control_callback
+        self.context_menu_callback = context_menu_callback
+        # 使用 finalize 代替 __del__，不会妨碍循环垃圾回收
+        weakref.finalize(self, logger.log_debug, "[GC] An AppEntry has been garbage collected.")
+        self.icon_loader = icon_loader
+        self.photo_cache = photo_cache
         self.default_bg = "white"
+        self._current_bg = self.default_bg
+        self._is_target = False
         self.photo = None
+        self._icon_source = None
+        self._icon_cache_key = None
+        self._last_name = None
+        self._last_title = None
+        self._last_artist = None
+        self._last_status = None
 
         self.grid_columnconfigure(1, weight=1)
         self.grid_rowconfigure(0, weight=1)
@@ -87,6 +209,10 @@ class AppEntry(tk.Frame):
 
         self.select_button = ttk.Button(self, text="锚定", command=self._on_select)
         self.select_button.grid(row=0, column=3, rowspan=3, padx=(5, 10), pady=5, sticky="nsew")
+
+        # 固定的标签集合，避免通过 winfo_children() 查询Tcl
+        self._labels = (self.icon_label, self.name_label, self.title_label, self.artist_label, self.status_label)
+        self._bg_widget_paths = tuple(str(widget) for widget in (self, *self._labels))
         
         self.update_info(app_info)
 
@@ -95,71 +221,119 @@ class AppEntry(tk.Frame):
     def bind_right_click(self):
         """为整个条目及其子控件绑定右键单击事件。"""
         self.bind("<Button-3>", self._on_right_click)
-        for widget in self.winfo_children():
-            # 不要覆盖按钮的左键单击事件
-            if widget != self.select_button:
-                widget.bind("<Button-3>", self._on_right_click)
+        # 不要覆盖按钮的左键单击事件，因此只绑定标签
+        for widget in self._labels:
+            widget.bind("<Button-3>", self._on_right_click)
 
     def _on_right_click(self, event):
-        """创建并显示右键菜单。"""
-        menu = tk.Menu(self, tearoff=0)
-        
-        # 播放/暂停 选项
-        status = self.app_info.get('status', 'Unknown')
-        if status in ['Playing', 'Paused']:
-            toggle_label = "暂停" if status == 'Playing' else "播放"
-            menu.add_command(label=toggle_label, command=lambda: self.on_control_callback('toggle_play_pause', self.app_info))
-        
-        menu.add_separator()
-        menu.add_command(label="属性...", command=lambda: self.on_control_callback('show_properties', self.app_info))
+        """通过列表共享的右键菜单显示当前条目的操作。"""
+        if self.context_menu_callback:
+            self.context_menu_callback(self.app_info, event)
 
-        try:
-            menu.tk_popup(event.x_root, event.y_root)
-        finally:
-            menu.grab_release()
+    def rebind(self, app_info, on_select_callback, on_control_callback):
+        """将一个已隐藏的条目重新绑定到新的应用，复用现有控件。"""
+        self.on_select_callback = on_select_callback
+        self.on_control_callback = on_control_callback
+        self._icon_source = None
+        self._icon_cache_key = None
+        self._last_name = None
+        self._last_title = None
+        self._last_artist = None
+        self._last_status = None
+        self.update_info(app_info)
 
     def update_info(self, app_info):
         if not self.winfo_exists(): return
         self.app_info = app_info
 
-        try:
-            scaling_factor = self.winfo_toplevel().tk.call('tk', 'scaling')
-        except (tk.TclError, AttributeError):
-            scaling_factor = 1.0
-        
-        base_icon_size = 32
-        icon_size = int(base_icon_size * scaling_factor)
+        self._update_icon(app_info.get('icon'), AppEntry._icon_size)
 
-        icon = app_info.get('icon')
-        if icon:
-            try:
-                img_copy = icon.copy()
-                img_copy.thumbnail((icon_size, icon_size), Image.Resampling.LANCZOS)
+        # 仅在文本变化时才调用 config，避免每次刷新都跨越 Python/Tcl 边界
+        name = app_info['display_name']
+        if name != self._last_name:
+            self.name_label.config(text=name)
+            self._last_name = name
 
-                final_image = Image.new("RGBA", (icon_size, icon_size), (0, 0, 0, 0))
-                paste_x = (icon_size - img_copy.width) // 2
-                paste_y = (icon_size - img_copy.height) // 2
-                final_image.paste(img_copy, (paste_x, paste_y))
+        title = app_info.get('title', 'N/A')
+        if title != self._last_title:
+            self.title_label.config(text=title)
+            self._last_title = title
 
-                self.photo = ImageTk.PhotoImage(final_image)
-                self.icon_label.config(image=self.photo, text="")
-                self.icon_label.image = self.photo # 锚定对图像的引用以防止垃圾回收
-            except Exception as e:
-                logger.log_error(f"Error updating icon: {e}")
-                self.icon_label.config(image='', text="🖼️")
-                self.icon_label.image = None
-        else:
+        artist = app_info.get('artist', '')
+        if artist != self._last_artist:
+            self.artist_label.config(text=artist)
+            self._last_artist = artist
+
+        status = app_info.get('status', 'Unknown')
+        status_display = _STATUS_DISPLAY.get(status, _PAUSED_STATUS_DISPLAY)
+        if status_display is not self._last_status:
+            status_text, status_color = status_display
+            self.status_label.config(text=status_text, fg=status_color)
+            self._last_status = status_display
+
+    def _update_icon(self, icon, icon_size):
+        """仅当图标对象或目标尺寸变化时才重新生成图标。"""
+        cache_key = (id(icon) if icon else None, icon_size)
+        if cache_key == self._icon_cache_key:
+            return
+        # 保留对源图标的引用，防止其被回收后 id 被复用而误命中
+        self._icon_source = icon
+        self._icon_cache_key = cache_key
+
+        if not icon:
             self.icon_label.config(image='', text="🎵")
             self.icon_label.image = None
+            return
 
-        self.name_label.config(text=app_info['display_name'])
-        self.title_label.config(text=app_info.get('title', 'N/A'))
-        self.artist_label.config(text=app_info.get('artist', ''))
+        if self.photo_cache is not None:
+            cached_photo = self.photo_cache.get(self._photo_cache_key(), icon)
+            if cached_photo is not None:
+                self._show_photo(cached_photo)
+                return
 
-        status = app_info.get('status', 'Unknown')
-        status_text = "▶️ 播放中" if status == 'Playing' else "⏸️ 已暂停"
-        status_color = "green" if status == 'Playing' else "orange"
-        self.status_label.config(text=status_text, fg=status_color)
+        if self.icon_loader:
+            # 缩放在后台线程中完成，结果经UI队列回到主线程后再创建 PhotoImage
+            self.icon_loader(self.app_info['sid'], cache_key, icon, icon_size)
+            return
+
+        try:
+            image = prepare_icon_image(icon, icon_size)
+        except Exception as e:
+            logger.log_error(f"Error updating icon: {e}")
+            image = None
+        self.set_icon_image(cache_key, image)
+
+    def set_icon_image(self, cache_key, image):
+        """在主线程中用已缩放好的图像更新图标；过期的结果会被忽略。"""
+        if not self.winfo_exists() or cache_key != self._icon_cache_key:
+            return
+
+        if image is None:
+            self._icon_cache_key = None
+            self.icon_label.config(image='', text="🖼️")
+            self.icon_label.image = None
+            return
+
+        try:
+            # 当前的 PhotoImage 可能仍存放在共享缓存中供其他条目使用，不能原地 paste，因此总是新建
+            photo = ImageTk.PhotoImage(image)
+            if self.photo_cache is not None:
+                self.photo_cache.put(self._photo_cache_key(), self._icon_source, photo)
+            self._show_photo(photo)
+        except Exception as e:
+            logger.log_error(f"Error updating icon: {e}")
+            self._icon_cache_key = None
+            self.icon_label.config(image='', text="🖼️")
+            self.icon_label.image = None
+
+    def _photo_cache_key(self):
+        icon_key, icon_size = self._icon_cache_key
+        return (self.app_info['sid'], icon_size, icon_key)
+
+    def _show_photo(self, photo):
+        self.photo = photo
+        self.icon_label.config(image=self.photo, text="")
+        self.icon_label.image = self.photo # 锚定对图像的引用以防止垃圾回收
 
     def _on_select(self):
         if self.on_select_callback:
@@ -173,24 +347,29 @@ class AppEntry(tk.Frame):
             self.icon_label.image = None # 打破循环引用
         
         self.photo = None
+        self._icon_source = None
         self.on_select_callback = None
         self.on_control_callback = None
+        self.context_menu_callback = None
+        self.icon_loader = None
+        # 共享缓存中的 PhotoImage 不在此处释放，仅解除本条目的引用
+        self.photo_cache = None
         self.app_info = None
         
         super().destroy()
 
-    def __del__(self):
-        print(f"[GC] An AppEntry has been garbage collected.")
-
     def set_as_target(self, is_target):
+        # 目标状态未变化时无需任何Tcl调用
+        if is_target == self._is_target: return
         if not self.winfo_exists(): return
+        self._is_target = is_target
         
         new_bg = "#e6f7ff" if is_target else self.default_bg
         
-        self.config(bg=new_bg)
-        for widget in self.winfo_children():
-            if isinstance(widget, tk.Label):
-                widget.config(bg=new_bg)
+        if new_bg != self._current_bg:
+            # 将条目及所有标签的背景色修改合并为一次Tcl调用
+            self.tk.eval("\n".join(f"{path} configure -background {new_bg}" for path in self._bg_widget_paths))
+            self._current_bg = new_bg
 
         if is_target:
             self.select_button.config(text="取消锚定", state="normal")
@@ -198,12 +377,22 @@ class AppEntry(tk.Frame):
             self.select_button.config(text="锚定", state="normal")
 
 class AppListWindow(tk.Frame):
+    # 空闲条目控件的最大缓存数量
+    MAX_FREE_ENTRIES = 8
+
     def __init__(self, parent):
         super().__init__(parent, bg="white")
         self.entries = {}
+        self._free_entries = []
+        weakref.finalize(self, logger.log_debug, "[GC] AppListWindow has been garbage collected.")
         self.target_app_source = None
         self.on_select_callback = None
         self.on_control_callback = None
+        self.icon_loader = None
+        self._photo_cache = PhotoImageCache(maxsize=64)
+
+        # 所有条目共享同一个右键菜单，弹出时再重新填充菜单项
+        self._context_menu = tk.Menu(self, tearoff=0)
 
         self.status_bar = StatusBar(self)
         self.status_bar.pack(side="top", fill="x")
@@ -224,40 +413,66 @@ class AppListWindow(tk.Frame):
 
     def update_app_list(self, app_infos):
         logger.log_debug(f"[GUI] 更新应用列表，接收 {len(app_infos)} 个应用信息")
-        current_sources = {app['source'] for app in app_infos}
-        existing_sources = set(self.entries.keys())
-
-        removed_count = 0
-        for source in existing_sources - current_sources:
-            logger.log_debug(f"[GUI] 移除应用: {self.entries[source].app_info['display_name']}")
-            self.entries[source].destroy()
-            del self.entries[source]
-            removed_count += 1
-            
-        added_count = 0
-        updated_count = 0
-        for app_info in app_infos:
-            source = app_info['source']
-            if source not in existing_sources:
+        # 以 worker 预先计算的整数 sid 作为键，集合运算比长字符串 source 更快
+        current = {app['sid']: app for app in app_infos}
+        current_sids = current.keys()
+        existing_sids = self.entries.keys()
+        # 在修改 self.entries 之前一次性算出三个分区
+        removed_sids = existing_sids - current_sids
+        added_sids = current_sids - existing_sids
+        updated_sids = current_sids & existing_sids
+
+        for sid in removed_sids:
+            entry = self.entries.pop(sid)
+            logger.log_debug(f"[GUI] 移除应用: {entry.app_info['display_name']}")
+            self._release_entry(entry)
+
+        for sid in updated_sids:
+            self.entries[sid].update_info(current[sid])
+
+        # 新条目按 app_infos 的顺序添加，保持列表顺序稳定
+        if added_sids:
+            for sid, app_info in current.items():
+                if sid not in added_sids:
+                    continue
                 logger.log_debug(f"[GUI] 添加新应用: {app_info['display_name']}")
-                entry = AppEntry(self.scrollable_frame, app_info, self._on_app_select, self._on_app_control)
+                entry = self._acquire_entry(app_info)
                 entry.pack(fill="x", pady=2, padx=5)
-                self.entries[source] = entry
-                added_count += 1
-            else:
-                entry = self.entries[source]
-                entry.update_info(app_info)
-                updated_count += 1
+                self.entries[sid] = entry
 
-        logger.log_debug(f"[GUI] 更新完成: 新增 {added_count} 个应用, 移除 {removed_count} 个应用, 更新 {updated_count} 个应用")
+        logger.log_debug(f"[GUI] 更新完成: 新增 {len(added_sids)} 个应用, 移除 {len(removed_sids)} 个应用, 更新 {len(updated_sids)} 个应用")
         self._update_target_highlight()
 
+    def _acquire_entry(self, app_info):
+        """优先复用空闲的条目控件，避免频繁创建Tk控件。"""
+        if self._free_entries:
+            entry = self._free_entries.pop()
+            entry.rebind(app_info, self._on_app_select, self._on_app_control)
+            return entry
+        return AppEntry(self.scrollable_frame, app_info, self._on_app_select, self._on_app_control, self.icon_loader, self._photo_cache, self.show_context_menu)
+
+    def _release_entry(self, entry):
+        """隐藏不再需要的条目并放入空闲列表；超出上限的直接销毁。"""
+        if len(self._free_entries) >= self.MAX_FREE_ENTRIES:
+            entry.destroy()
+            return
+        entry.pack_forget()
+        self._free_entries.append(entry)
+
     def update_status(self, target_name=None, is_monitoring=True):
         self.status_bar.update_status(target_name, is_monitoring)
 
-    def set_callbacks(self, select_callback, control_callback):
+    def set_callbacks(self, select_callback, control_callback, icon_loader=None):
         self.on_select_callback = select_callback
         self.on_control_callback = control_callback
+        self.icon_loader = icon_loader
+
+    def apply_icon_images(self, icon_results):
+        """将后台线程缩放完成的图标交给对应的条目。"""
+        for sid, (cache_key, image) in icon_results.items():
+            entry = self.entries.get(sid)
+            if entry:
+                entry.set_icon_image(cache_key, image)
 
     def _on_app_control(self, command, app_info):
         """处理来自AppEntry右键菜单的控制命令。"""
@@ -265,7 +480,27 @@ class AppListWindow(tk.Frame):
             return self.on_control_callback(command, app_info)
         return None
 
+    def show_context_menu(self, app_info, event):
+        """为指定应用填充并显示共享的右键菜单。"""
+        menu = self._context_menu
+        menu.delete(0, 'end')
+
+        # 播放/暂停 选项
+        status = app_info.get('status', 'Unknown')
+        if status in ['Playing', 'Paused']:
+            toggle_label = "暂停" if status == 'Playing' else "播放"
+            menu.add_command(label=toggle_label, command=lambda: self._on_app_control('toggle_play_pause', app_info))
+        
+        menu.add_separator()
+        menu.add_command(label="属性...", command=lambda: self._on_app_control('show_properties', app_info))
+
+        try:
+            menu.tk_popup(event.x_root, event.y_root)
+        finally:
+            menu.grab_release()
+
     def _on_app_select(self, app_info):
+        previous_source = self.target_app_source
         if self.target_app_source == app_info['source']:
             self.target_app_source = None
             logger.log_info(f"GUI: 用户取消了 {app_info['display_name']} 的目标状态。")
@@ -276,7 +511,9 @@ class AppListWindow(tk.Frame):
             logger.log_info(f"GUI: 用户选择了 {app_info['display_name']} 作为目标。")
             if self.on_select_callback:
                 self.on_select_callback(app_info)
-        self._update_target_highlight()
+        # 只有旧目标和新目标两个条目的状态会改变
+        self._set_entry_target(previous_source, False)
+        self._set_entry_target(self.target_app_source, True)
 
     def _on_frame_configure(self, event):
         self.canvas.configure(scrollregion=self.canvas.bbox("all"))
@@ -289,31 +526,50 @@ class AppListWindow(tk.Frame):
         except tk.TclError:
             pass
 
+    def _set_entry_target(self, source, is_target):
+        entry = self.entries.get(make_source_id(source)) if source else None
+        if entry:
+            entry.set_as_target(is_target)
+
     def _update_target_highlight(self):
-        for source, entry in self.entries.items():
-            entry.set_as_target(source == self.target_app_source)
+        target_sid = make_source_id(self.target_app_source) if self.target_app_source else None
+        for sid, entry in self.entries.items():
+            entry.set_as_target(sid == target_sid)
 
     def destroy(self):
         logger.log_debug("[GUI] 正在销毁AppListWindow及其所有子条目...")
         for entry in self.entries.values():
             entry.destroy()
         self.entries.clear()
+        for entry in self._free_entries:
+            entry.destroy()
+        self._free_entries.clear()
+        # 显式释放共享的 PhotoImage，让Tk删除对应的图像，而不是依赖 gc.collect()
+        self._photo_cache.clear()
         super().destroy()
         logger.log_debug("[GUI] AppListWindow销毁完成")
 
-    def __del__(self):
-        print("[GC] AppListWindow has been garbage collected.")
-
 
 # =====================================================================================
 # Main Application
 # =====================================================================================
 
+# 在一个UI轮询周期内只需应用最新一条的消息类型
+COALESCED_UI_MESSAGES = ('update_list', 'update_status', 'update_audio_apps')
+# UI队列轮询间隔（毫秒），空闲一段时间后退避到较低频率
+UI_POLL_BUSY_MS = 100
+UI_POLL_IDLE_MS = 250
+UI_IDLE_POLLS_BEFORE_BACKOFF = 5
+
 class AudioFocusApp(tk.Tk):
     def __init__(self):
         super().__init__()
         self.title("Audio Focus Manager")
         self.protocol("WM_DELETE_WINDOW", self.on_closing)
+        weakref.finalize(self, logger.log_debug, "[GC] AudioFocusApp has been garbage collected.")
+
+        self._refresh_tk_scaling()
+        _style_init(self)
 
         self.tray_icon = None
         self.system_queue = queue.Queue()
@@ -324,6 +580,9 @@ class AudioFocusApp(tk.Tk):
         self.mem_snapshot = None
         
         self.setup_menu()
+
+        # 图标缩放、设置窗口数据整理等不涉及 Tk 的工作在此线程池中完成，PhotoImage 仍在主线程创建
+        self._worker_pool = ThreadPoolExecutor(max_workers=2, thread_name_prefix='UIWorker_')
         
         self.toggle_debug_mode(is_initial_setup=True)
         self.toggle_always_on_top(is_initial_setup=True)
@@ -332,7 +591,8 @@ class AudioFocusApp(tk.Tk):
         self.app_list_window.pack(fill="both", expand=True)
         self.app_list_window.set_callbacks(
             select_callback=self.on_target_app_selected,
-            control_callback=self.on_app_control
+            control_callback=self.on_app_control,
+            icon_loader=self.request_icon_image
         )
 
         self.target_app_info = None
@@ -342,8 +602,11 @@ class AudioFocusApp(tk.Tk):
         self.properties_window = None
         self.settings_window = None
         
-        self.ui_queue = queue.Queue()
-        self.worker_queue = queue.Queue()
+        # UI队列只用到 put/get_nowait，使用更轻量的 SimpleQueue；
+        # 后台工作线程在事件循环中直接 await 消息
+        self.ui_queue = queue.SimpleQueue()
+        self.worker_queue = WorkerQueue()
+        self._idle_ui_polls = 0
         self.worker = BackgroundWorker(self.ui_queue, self.worker_queue)
         self.worker_thread = threading.Thread(target=self.worker.run, daemon=True)
         self.worker_thread.start()
@@ -356,16 +619,33 @@ class AudioFocusApp(tk.Tk):
         self.geometry("900x400")
 
         self._resize_job = None
+        self._last_seen_width = None
         self.bind('<Configure>', self._on_resize_debounced)
         self._last_applied_width = 900
         self._last_applied_height = 400
 
+    def _refresh_tk_scaling(self):
+        """读取一次Tk缩放因子并共享给所有AppEntry。"""
+        try:
+            scaling_factor = float(self.tk.call('tk', 'scaling'))
+        except (tk.TclError, ValueError):
+            scaling_factor = 1.0
+        if AppEntry.set_scaling(scaling_factor):
+            logger.log_debug(f"[GUI] Tk缩放因子更新为: {scaling_factor}")
+
     def _on_resize_debounced(self, event):
+        # 子控件重排也会冒泡出 Configure 事件，只关心主窗口自身的宽度变化
+        if event.widget is not self or event.width == self._last_seen_width:
+            return
+        self._last_seen_width = event.width
         if self._resize_job:
             self.after_cancel(self._resize_job)
-        self._resize_job = self.after(50, self._perform_resize)
+        self._resize_job = self.after(100, self._perform_resize)
 
     def _perform_resize(self):
+        # 窗口移动到不同DPI的显示器时会触发Configure，借此刷新缓存的缩放因子
+        self._refresh_tk_scaling()
+
         current_width = self.winfo_width()
         current_height = self.winfo_height()
 
@@ -473,44 +753,97 @@ class AudioFocusApp(tk.Tk):
         self.worker_queue.put({'type': 'state_update', 'data': state})
 
     def process_ui_queue(self):
+        # 每个周期内，同类型的列表/状态更新只保留最新一条；
+        # 其余消息按到达顺序处理，但合并连续重复的消息
+        latest_updates = {}
+        ordered_messages = []
         try:
             while not self.ui_queue.empty():
                 message = self.ui_queue.get_nowait()
                 msg_type = message.get('type')
                 data = message.get('data')
+                if msg_type in COALESCED_UI_MESSAGES:
+                    latest_updates[msg_type] = data
+                elif msg_type == 'icon_ready':
+                    sid, cache_key, image = data
+                    latest_updates.setdefault('icon_ready', {})[sid] = (cache_key, image)
+                elif not ordered_messages or ordered_messages[-1] != (msg_type, data):
+                    ordered_messages.append((msg_type, data))
+        except queue.Empty:
+            pass
 
-                # 仅在窗口可见时处理UI更新
-                if self.state() == 'normal':
-                    if msg_type in ['update_list', 'update_status']:
-                        if not self.app_list_window or not self.app_list_window.winfo_exists():
-                            logger.log_debug(f"UI不存在，忽略UI消息: {msg_type}")
-                            continue
-
-                    if msg_type == 'update_list':
-                        self.latest_app_infos = {app['source']: app for app in data}
-                        self.app_list_window.update_app_list(data)
-                        self._update_properties_window_if_open()
-                    elif msg_type == 'update_status':
-                        self.app_list_window.update_status(**data)
-                
-                # 这些消息应该总是被处理，无论窗口是否可见
-                if msg_type == 'set_paused_flag':
-                    self.was_paused_by_app = data
-                    self._send_state_to_worker()
-                elif msg_type == 'target_closed':
-                    self.target_app_info = None
-                    self.was_paused_by_app = False
-                    if self.app_list_window and self.app_list_window.winfo_exists():
-                        self.app_list_window.update_status(target_name=None)
-                    self._send_state_to_worker()
-                elif msg_type == 'update_audio_apps':
-                    self.current_audio_apps = data
-                    self._update_settings_window_if_open()
+        if latest_updates or ordered_messages:
+            self._idle_ui_polls = 0
+            # 让Tk先处理完挂起的事件和重绘，再执行开销较大的列表更新
+            self.after_idle(self._apply_ui_updates, latest_updates, ordered_messages)
+        else:
+            self._idle_ui_polls += 1
 
-        except queue.Empty:
+        # 队列连续空闲若干个周期后降低轮询频率
+        if self._idle_ui_polls >= UI_IDLE_POLLS_BEFORE_BACKOFF:
+            self.after(UI_POLL_IDLE_MS, self.process_ui_queue)
+        else:
+            self.after(UI_POLL_BUSY_MS, self.process_ui_queue)
+
+    def _apply_ui_updates(self, latest_updates, ordered_messages):
+        """应用一个周期内收集到的UI消息。"""
+        # 这些消息应该总是被处理，无论窗口是否可见
+        for msg_type, data in ordered_messages:
+            if msg_type == 'set_paused_flag':
+                self.was_paused_by_app = data
+                self._send_state_to_worker()
+            elif msg_type == 'settings_apps_ready':
+                settings_window, prepared = data
+                # 忽略已关闭或已被替换的设置窗口的结果
+                if settings_window is self.settings_window and settings_window.winfo_exists():
+                    settings_window.apply_prepared_apps(prepared)
+            elif msg_type == 'target_closed':
+                self.target_app_info = None
+                self.was_paused_by_app = False
+                if self.app_list_window and self.app_list_window.winfo_exists():
+                    self.app_list_window.update_status(target_name=None)
+                self._send_state_to_worker()
+
+        if 'update_audio_apps' in latest_updates:
+            self.current_audio_apps = latest_updates['update_audio_apps']
+            self._update_settings_window_if_open()
+
+        # 图标结果需始终应用，否则条目会一直等待已提交的缩放任务
+        if 'icon_ready' in latest_updates and self.app_list_window and self.app_list_window.winfo_exists():
+            self.app_list_window.apply_icon_images(latest_updates['icon_ready'])
+
+        # 仅在窗口可见时处理UI更新
+        if self.state() != 'normal':
+            return
+        if 'update_list' not in latest_updates and 'update_status' not in latest_updates:
+            return
+        if not self.app_list_window or not self.app_list_window.winfo_exists():
+            logger.log_debug("UI不存在，忽略UI列表/状态消息")
+            return
+
+        if 'update_list' in latest_updates:
+            data = latest_updates['update_list']
+            self.latest_app_infos = {app['source']: app for app in data}
+            self.app_list_window.update_app_list(data)
+            self._update_properties_window_if_open()
+        if 'update_status' in latest_updates:
+            self.app_list_window.update_status(**latest_updates['update_status'])
+
+    def request_icon_image(self, sid, cache_key, icon, icon_size):
+        """在后台线程中缩放图标，完成后通过UI队列通知主线程。"""
+        def on_done(future):
+            try:
+                image = future.result()
+            except Exception as e:
+                logger.log_error(f"Error updating icon: {e}")
+                image = None
+            self.ui_queue.put({'type': 'icon_ready', 'data': (sid, cache_key, image)})
+
+        try:
+            self._worker_pool.submit(prepare_icon_image, icon, icon_size).add_done_callback(on_done)
+        except RuntimeError:
+            # 线程池已关闭（程序正在退出）
             pass
-        finally:
-            self.after(100, self.process_ui_queue)
 
     def process_system_queue(self):
         try:
@@ -538,27 +871,48 @@ class AudioFocusApp(tk.Tk):
         if self.settings_window and self.settings_window.winfo_exists():
             self.settings_window.destroy()
         
+        # 设置窗口较少打开，延迟导入以缩短启动时间
+        from settings_window import SettingsWindow
         self.settings_window = SettingsWindow(self)
         self.settings_window.protocol("WM_DELETE_WINDOW", self._on_settings_window_close)
         
         current_retention_days = config_manager.get('logging.log_retention_days')
         whitelist = config_manager.get('audio.whitelist', {})
         
-        all_known_apps_cache = self.worker.get_all_known_apps()
-        final_app_list_for_settings = list(all_known_apps_cache.values())
-
         self.settings_window.set_initial_values(
             debug=self.debug_mode_var.get(),
             top=self.always_on_top_var.get(),
             retention=current_retention_days,
             whitelist=whitelist,
-            all_audio_apps=final_app_list_for_settings,
             ignore_manual_pause=config_manager.get('general.ignore_manual_pause', False)
         )
+        self._prepare_settings_apps(self.settings_window, whitelist)
         
         # 不再使用 wait_window，以允许主窗口继续接收事件
         # self.wait_window(settings_win)
 
+    def _prepare_settings_apps(self, settings_window, whitelist):
+        """在后台线程中整理设置窗口的应用列表，完成后通过UI队列交给主线程。"""
+        from settings_window import prepare_whitelist_data
+
+        def job():
+            all_known_apps = list(self.worker.get_all_known_apps().values())
+            return prepare_whitelist_data(whitelist, all_known_apps)
+
+        def on_done(future):
+            try:
+                prepared = future.result()
+            except Exception as e:
+                logger.log_error(f"准备设置窗口应用列表时出错: {e}")
+                return
+            self.ui_queue.put({'type': 'settings_apps_ready', 'data': (settings_window, prepared)})
+
+        try:
+            self._worker_pool.submit(job).add_done_callback(on_done)
+        except RuntimeError:
+            # 线程池已关闭（程序正在退出）
+            pass
+
     def _on_settings_window_close(self):
         if not self.settings_window:
             return
@@ -600,14 +954,10 @@ class AudioFocusApp(tk.Tk):
             logger.log_info(f"[GUI] 窗口置顶状态切换为: {is_on_top}")
 
     def create_image(self, width, height, color1, color2):
-        image = Image.new('RGB', (width, height), color1)
-        dc = ImageDraw.Draw(image)
-        dc.rectangle((width // 2, 0, width, height // 2), fill=color2)
-        dc.rectangle((0, height // 2, width // 2, height), fill=color2)
-        return image
+        return create_tray_image(width, height, color1, color2)
 
     def setup_tray_icon(self):
-        image = self.create_image(64, 64, 'black', 'white')
+        image = self.create_image(*TRAY_ICON_SPEC)
         menu = (
             item('显示', lambda: self.system_queue.put('show'), default=True),
             item('退出', lambda: self.system_queue.put('quit'))
@@ -625,9 +975,6 @@ class AudioFocusApp(tk.Tk):
         self.lift()
         self.focus_force()
 
-    def __del__(self):
-        print("[GC] AudioFocusApp has been garbage collected.")
-
     def quit_app(self):
         logger.log_info("开始执行退出程序...")
         
@@ -637,12 +984,15 @@ class AudioFocusApp(tk.Tk):
         
         if hasattr(self, 'worker_thread') and self.worker_thread.is_alive():
             logger.log_info("正在等待后台线程终止...")
-            self.worker_thread.join(timeout=2)
+            # 后台线程关闭时最多有两个各 SHUTDOWN_TIMEOUT 秒的等待阶段，再留出清理与保存缓存的余量
+            self.worker_thread.join(timeout=2 * BackgroundWorker.SHUTDOWN_TIMEOUT + 1)
             if self.worker_thread.is_alive():
                 logger.log_warning("后台线程在超时后仍在运行。")
             else:
                 logger.log_info("后台线程已成功终止。")
 
+        self._worker_pool.shutdown(wait=False)
+
         if self.tray_icon:
             logger.log_info("正在停止系统托盘图标...")
             self.tray_icon.stop()
@@ -671,6 +1021,7 @@ class AudioFocusApp(tk.Tk):
             
             source = app_info.get('source')
             latest_info = self.latest_app_infos.get(source, app_info)
+            from properties_window import PropertiesWindow
             self.properties_window = PropertiesWindow(self, latest_info)
             self.properties_window.protocol("WM_DELETE_WINDOW", self._on_properties_window_close)
             
@@ -720,6 +1071,10 @@ class AudioFocusApp(tk.Tk):
 
     def _take_memory_snapshot(self):
         """捕获当前的内存分配快照。"""
+        if not tracemalloc.is_tracing():
+            # 非调试模式启动时未开启跟踪，此时才开始跟踪，之后的分配才会被记录
+            tracemalloc.start()
+            logger.log_info("内存分配跟踪已启动。")
         self.mem_snapshot = tracemalloc.take_snapshot()
         logger.log_info("内存快照已捕获。")
         print("内存快照已捕获。")
@@ -1,43 +1,301 @@
 import os
-import time
+import sys
+import json
 import win32api
-from pycaw.pycaw import AudioUtilities, IAudioMeterInformation
+import pywintypes
+from pycaw.pycaw import AudioSession, AudioUtilities, IAudioMeterInformation, IAudioSessionControl2
 import psutil
 from logger import logger
 from cachetools import TTLCache
-from threading import RLock
+from threading import Lock
+
+try:
+    # 较新版本的 pycaw 提供会话通知回调的基类；不可用时退回纯轮询
+    from pycaw.callbacks import AudioSessionEvents, AudioSessionNotification
+except ImportError:
+    AudioSessionEvents = AudioSessionNotification = None
 
 # --- 缓存 ---
 executable_details_cache = TTLCache(maxsize=256, ttl=3600)
-executable_details_lock = RLock()
+executable_details_lock = Lock()
+_MISSING = object()
+# (pid, create_time) -> (process_name, exe_path, display_name)
+process_identity_cache = TTLCache(maxsize=512, ttl=300)
+# (pid, create_time) -> process_name，仅供尚未播放过的静默会话使用
+process_name_cache = TTLCache(maxsize=512, ttl=300)
 
-def get_executable_details(exe_path):
+# --- 持久化的文件详情缓存 ---
+# exe_path -> {'mtime_ns', 'size', 'details'}，文件被修改后自动失效
+EXE_DETAILS_CACHE_FILE = 'exe_details_cache.json'
+EXE_DETAILS_FLUSH_EVERY = 8
+EXE_DETAILS_PERSIST_MAX = 256
+# 按最近使用排序，保存时只保留最后 EXE_DETAILS_PERSIST_MAX 条
+persistent_details = {}
+_persistent_state = {'loaded': False, 'dirty': 0}
+_persistent_save_lock = Lock()
+
+def load_executable_details_cache(cache_path=EXE_DETAILS_CACHE_FILE):
+    """从磁盘加载上次运行时保存的文件详情缓存。"""
     with executable_details_lock:
-        if exe_path in executable_details_cache:
-            logger.log_debug(f"[文件详情缓存] 命中: {exe_path}")
-            return executable_details_cache[exe_path]
+        if _persistent_state['loaded']:
+            return
+        _persistent_state['loaded'] = True
+        if not os.path.exists(cache_path):
+            return
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as f:
+                data = json.load(f)
+            if isinstance(data, dict):
+                persistent_details.update(data)
+            logger.log_debug("[文件详情缓存] 已从 '%s' 加载 %d 条记录", cache_path, len(persistent_details))
+        except Exception as e:
+            logger.log_warning(f"[文件详情缓存] 加载持久化缓存失败: {e}")
+
+def save_executable_details_cache(cache_path=EXE_DETAILS_CACHE_FILE):
+    """将文件详情缓存写回磁盘。"""
+    # 周期性写盘与关闭时的写盘可能同时发生，串行化以免共用同一个临时文件
+    with _persistent_save_lock:
+        with executable_details_lock:
+            dirty = _persistent_state['dirty']
+            if not dirty:
+                return
+            snapshot = dict(list(persistent_details.items())[-EXE_DETAILS_PERSIST_MAX:])
+        try:
+            tmp_path = cache_path + '.tmp'
+            with open(tmp_path, 'w', encoding='utf-8') as f:
+                json.dump(snapshot, f, ensure_ascii=False)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            # 保留脏计数，下次写盘时重试
+            logger.log_warning(f"[文件详情缓存] 保存持久化缓存失败: {e}")
+            return
+        with executable_details_lock:
+            # 写盘期间新加入的条目仍计为未保存
+            _persistent_state['dirty'] -= dirty
+        logger.log_debug("[文件详情缓存] 已保存 %d 条记录到 '%s'", len(snapshot), cache_path)
+
+def get_executable_details(exe_path):
+    # 驻留路径字符串，使同一路径在进程生命周期内只计算一次哈希
+    exe_path = sys.intern(exe_path)
+    # 内存缓存只在监控线程中访问，单次 get/set 无需加锁；
+    # 锁仅用于保护可能在关闭时被写盘的持久化缓存
+    cached = executable_details_cache.get(exe_path, _MISSING)
+    if cached is not _MISSING:
+        logger.log_debug("[文件详情缓存] 命中: %s", exe_path)
+        return cached
+
+    try:
+        st = os.stat(exe_path)
+        fingerprint = (st.st_mtime_ns, st.st_size)
+    except OSError:
+        fingerprint = None
+
+    if fingerprint:
+        with executable_details_lock:
+            entry = persistent_details.pop(exe_path, None)
+            if entry is not None:
+                # 重新插入到末尾，保存时按最近使用保留
+                persistent_details[exe_path] = entry
+        if entry and (entry.get('mtime_ns'), entry.get('size')) == fingerprint:
+            details = entry.get('details')
+            executable_details_cache[exe_path] = details
+            logger.log_debug("[文件详情缓存] 持久化缓存命中: %s", exe_path)
+            return details
     
-    logger.log_debug(f"[文件详情缓存] 未命中，开始读取: {exe_path}")
+    logger.log_debug("[文件详情缓存] 未命中，开始读取: %s", exe_path)
     details = None
     try:
         lang, codepage = win32api.GetFileVersionInfo(exe_path, '\\VarFileInfo\\Translation')[0]
         string_file_info = f'\\StringFileInfo\\{lang:04x}{codepage:04x}\\'
-        file_description = win32api.GetFileVersionInfo(exe_path, string_file_info + 'FileDescription')
-        details = file_description or win32api.GetFileVersionInfo(exe_path, string_file_info + 'ProductName')
-        logger.log_debug(f"[文件详情缓存] 读取成功: {details}")
+        # 优先读取 FileDescription；只有其缺失或为空时才再查询 ProductName
+        for field in ('FileDescription', 'ProductName'):
+            try:
+                details = win32api.GetFileVersionInfo(exe_path, string_file_info + field)
+            except pywintypes.error:
+                details = None
+            if details:
+                break
+        logger.log_debug("[文件详情缓存] 读取成功: %s", details)
     except Exception as e:
         logger.log_warning(f"[文件详情缓存] 读取失败: {exe_path}, 错误: {e}")
         pass
+    executable_details_cache[exe_path] = details
+    logger.log_debug("[文件详情缓存] 已缓存 '%s' 的结果: %s", exe_path, details)
     with executable_details_lock:
-        executable_details_cache[exe_path] = details
-        logger.log_debug(f"[文件详情缓存] 已缓存 '{exe_path}' 的结果: {details}")
+        if fingerprint:
+            persistent_details.pop(exe_path, None)
+            persistent_details[exe_path] = {'mtime_ns': fingerprint[0], 'size': fingerprint[1], 'details': details}
+            _persistent_state['dirty'] += 1
+            should_flush = _persistent_state['dirty'] >= EXE_DETAILS_FLUSH_EVERY
+        else:
+            should_flush = False
+    if should_flush:
+        save_executable_details_cache()
     return details
 
+def resolve_process_identity(process):
+    """返回进程的 (process_name, exe_path, display_name)，结果按 (pid, create_time) 缓存。"""
+    # 进程名和路径在进程生命周期内不变；用 create_time 区分被复用的PID
+    identity_key = (process.pid, process.create_time())
+    identity = process_identity_cache.get(identity_key)
+    if identity is not None:
+        return identity
+    try:
+        # oneshot 让 name/exe 共享同一次进程信息查询
+        with process.oneshot():
+            # 驻留进程名，后续与白名单键的比较可走指针相等的快速路径
+            process_name = sys.intern(process.name())
+            exe_path = process.exe()
+    except psutil.NoSuchProcess:
+        process_identity_cache.pop(identity_key, None)
+        raise
+    display_name = get_executable_details(exe_path) or process_name
+    identity = (process_name, exe_path, display_name)
+    process_identity_cache[identity_key] = identity
+    return identity
+
+def peek_process_identity(process):
+    """
+    静默会话使用的轻量版 resolve_process_identity：已完整解析过的进程直接返回缓存结果，
+    否则只读取进程名，exe 路径为 None，显示名暂用进程名，等会话开始播放时再完整解析。
+    """
+    identity_key = (process.pid, process.create_time())
+    identity = process_identity_cache.get(identity_key)
+    if identity is not None:
+        return identity
+    process_name = process_name_cache.get(identity_key)
+    if process_name is None:
+        process_name = process_name_cache[identity_key] = sys.intern(process.name())
+    return (process_name, None, process_name)
+
+if AudioSessionNotification is not None:
+    class _SessionCreatedNotifier(AudioSessionNotification):
+        """新音频会话创建时通知监控器（由音频服务线程回调）。"""
+        def __init__(self, on_change):
+            super().__init__()
+            self._on_change = on_change
+
+        def on_session_created(self, new_session):
+            self._on_change()
+
+    class _SessionStateNotifier(AudioSessionEvents):
+        """会话状态变化（激活/停止/过期）或断开时通知监控器。"""
+        def __init__(self, on_change):
+            super().__init__()
+            self._on_change = on_change
+
+        def on_state_changed(self, new_state, new_state_id):
+            self._on_change()
+
+        def on_session_disconnected(self, disconnect_reason, disconnect_reason_id):
+            self._on_change()
+
 class AudioMonitor:
     """
-    一个无状态的音频监控器，用于获取当前正在播放音频的应用程序。
-    遵循“即用即取，用完即弃”的原则，以防止COM对象泄漏。
+    一个音频监控器，用于获取当前正在播放音频的应用程序。
+    仅缓存会话管理器；会话及其COM对象遵循“即用即取，用完即弃”的原则，以防止COM对象泄漏。
     """
+    # 每隔多少次轮询重新获取一次会话管理器，以跟随默认输出设备的变化
+    SESSION_MANAGER_REFRESH_POLLS = 30
+
+    def __init__(self, on_change=None):
+        load_executable_details_cache()
+        # 缓存 IAudioSessionManager2；创建设备枚举器并激活管理器是开销最大的COM操作
+        self._session_manager = None
+        self._polls_since_refresh = 0
+
+        # 会话变化通知：on_change 会在音频服务线程上被调用，必须是线程安全的
+        self._on_change = on_change if AudioSessionNotification is not None else None
+        self._created_notifier = None
+        # 会话实例ID -> (IAudioSessionControl2, 状态通知对象)
+        self._session_notifiers = {}
+
+    def _set_session_manager(self, manager):
+        """替换缓存的会话管理器，并将会话创建通知迁移到新管理器上。"""
+        old_manager = self._session_manager
+        self._session_manager = manager
+        if not self._on_change:
+            return
+        if old_manager is not None and self._created_notifier is not None:
+            try:
+                old_manager.UnregisterSessionNotification(self._created_notifier)
+            except Exception as e:
+                logger.log_debug("[音频监控] 注销会话创建通知失败: %s", e)
+        self._created_notifier = None
+        if manager is not None:
+            try:
+                notifier = _SessionCreatedNotifier(self._on_change)
+                manager.RegisterSessionNotification(notifier)
+                self._created_notifier = notifier
+            except Exception as e:
+                logger.log_warning(f"[音频监控] 注册会话创建通知失败: {e}")
+
+    def _sync_session_notifiers(self, sessions):
+        """为新出现的会话注册状态通知，并注销已消失会话的通知。"""
+        seen = set()
+        for session in sessions:
+            ctl = session._ctl
+            try:
+                instance_id = ctl.GetSessionInstanceIdentifier()
+            except Exception:
+                continue
+            seen.add(instance_id)
+            if instance_id in self._session_notifiers:
+                continue
+            try:
+                notifier = _SessionStateNotifier(self._on_change)
+                ctl.RegisterAudioSessionNotification(notifier)
+                self._session_notifiers[instance_id] = (ctl, notifier)
+            except Exception as e:
+                logger.log_debug("[音频监控] 注册会话状态通知失败: %s", e)
+
+        for instance_id in [k for k in self._session_notifiers if k not in seen]:
+            ctl, notifier = self._session_notifiers.pop(instance_id)
+            try:
+                ctl.UnregisterAudioSessionNotification(notifier)
+            except Exception:
+                pass
+
+    def close(self):
+        """注销所有会话通知并释放缓存的会话管理器。应在创建本对象的COM线程上调用。"""
+        if self._on_change:
+            for ctl, notifier in self._session_notifiers.values():
+                try:
+                    ctl.UnregisterAudioSessionNotification(notifier)
+                except Exception:
+                    pass
+            self._session_notifiers.clear()
+        # 无论是否启用通知都要释放，确保COM对象在 CoUninitialize 之前于本线程上释放
+        self._set_session_manager(None)
+
+    def _get_sessions(self):
+        """使用缓存的会话管理器枚举当前的音频会话。"""
+        if self._session_manager is None or self._polls_since_refresh >= self.SESSION_MANAGER_REFRESH_POLLS:
+            self._set_session_manager(AudioUtilities.GetAudioSessionManager())
+            self._polls_since_refresh = 0
+        self._polls_since_refresh += 1
+        if self._session_manager is None:
+            return []
+
+        try:
+            session_enumerator = self._session_manager.GetSessionEnumerator()
+        except Exception:
+            # 管理器可能因设备变化而失效，丢弃后下次重新获取
+            self._set_session_manager(None)
+            raise
+
+        sessions = []
+        for i in range(session_enumerator.GetCount()):
+            ctl = session_enumerator.GetSession(i)
+            if ctl is None:
+                continue
+            ctl2 = ctl.QueryInterface(IAudioSessionControl2)
+            if ctl2 is not None:
+                sessions.append(AudioSession(ctl2))
+        if self._on_change:
+            self._sync_session_notifiers(sessions)
+        return sessions
+
     def get_audio_playing_apps(self):
         """
         获取当前所有正在播放音频的应用列表。
@@ -45,27 +303,39 @@ class AudioMonitor:
         """
         apps = []
         try:
-            sessions = AudioUtilities.GetAllSessions()
+            sessions = self._get_sessions()
         except Exception as e:
             logger.log_error(f"[音频监控] 获取音频会话时出错: {e}")
             return []
 
+        # --- 第一遍：一次性读取所有会话的COM数据 ---
+        # 复用 pycaw 已为会话创建的 psutil.Process，避免按PID重复打开进程
+        snapshot = []
         for session in sessions:
-            if not session.Process:
-                continue
-            
             try:
-                pid = session.ProcessId
-                p = psutil.Process(pid)
-                process_name = p.name()
-                exe_path = p.exe()
-                
-                display_name = get_executable_details(exe_path) or process_name
-                
                 # 直接查询并使用，不缓存COM对象
                 audio_meter = session._ctl.QueryInterface(IAudioMeterInformation)
                 peak_value = audio_meter.GetPeakValue()
+                process = session.Process
+                if not process:
+                    continue
+                snapshot.append((session.ProcessId, process, peak_value))
+            except psutil.NoSuchProcess:
+                continue
+            except Exception as e:
+                logger.log_warning(f"[音频监控] 读取会话PID {session.ProcessId} 的音量峰值时出错: {e}")
+
+        # --- 第二遍：关联进程信息，同一进程的多个会话只解析一次 ---
+        identities = {}
+        for pid, process, peak_value in snapshot:
+            try:
                 is_playing = peak_value > 0.01
+                identity = identities.get(pid)
+                # 静默会话不读取 exe 路径和版本信息；开始播放时才完整解析
+                if identity is None or (is_playing and identity[1] is None):
+                    resolve = resolve_process_identity if is_playing else peek_process_identity
+                    identity = identities[pid] = resolve(process)
+                process_name, exe_path, display_name = identity
                 
                 apps.append({
                     'pid': pid,
@@ -79,8 +349,8 @@ class AudioMonitor:
                 continue
             except Exception as e:
                 # 捕获其他潜在错误，例如权限问题
-                logger.log_warning(f"[音频监控] 处理会话PID {session.ProcessId} ({process_name if 'process_name' in locals() else 'N/A'}) 时出错: {e}")
+                logger.log_warning(f"[音频监控] 处理会话PID {pid} 时出错: {e}")
                 continue
         
-        logger.log_debug(f"[音频监控] 轮询完成，发现 {len(apps)} 个活动会话。")
-        return apps
\ No newline at end of file
+        logger.log_debug("[音频监控] 轮询完成，发现 %d 个活动会话。", len(apps))
+        return apps
@@ -1,10 +1,18 @@
 import yaml
 import os
+import sys
+import pickle
 from logger import logger
 
+try:
+    from yaml import CSafeLoader as _YamlLoader
+except ImportError:
+    from yaml import SafeLoader as _YamlLoader
+
 class ConfigManager:
     def __init__(self, config_path='config.yaml'):
         self.config_path = config_path
+        self.parsed_cache_path = config_path + '.cache.pkl'
         self.defaults = {
             'general': {
                 'always_on_top': False,
@@ -21,6 +29,7 @@ class ConfigManager:
             }
         }
         self.config = self._load_config()
+        self._rebuild_flat()
 
     def _load_config(self):
         """加载YAML配置文件。如果文件不存在，则创建并使用默认值。"""
@@ -31,19 +40,42 @@ class ConfigManager:
             return self.defaults
         
         try:
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                user_config = yaml.safe_load(f)
-                if not user_config:
-                    logger.log_warning(f"配置文件 '{self.config_path}' 为空，将使用默认值。")
-                    return self.defaults
-                
-                # 验证并合并配置
-                validated_config = self._validate_config(user_config)
-                return validated_config
+            user_config = self._read_user_config()
+            if not user_config:
+                logger.log_warning(f"配置文件 '{self.config_path}' 为空，将使用默认值。")
+                return self.defaults
+
+            # 验证并合并配置
+            validated_config = self._validate_config(user_config)
+            return validated_config
         except Exception as e:
             logger.log_error(f"加载配置文件 '{self.config_path}' 时出错: {e}。将使用默认值。")
             return self.defaults
 
+    def _read_user_config(self):
+        """读取YAML文件内容。文件未变化时（mtime 与大小一致）直接使用 pickle 缓存，跳过YAML解析。"""
+        st = os.stat(self.config_path)
+        fingerprint = (st.st_mtime_ns, st.st_size)
+
+        try:
+            with open(self.parsed_cache_path, 'rb') as f:
+                cached = pickle.load(f)
+            if cached.get('fingerprint') == fingerprint:
+                logger.log_debug("[配置] 配置文件未变化，使用解析缓存。")
+                return cached['config']
+        except Exception:
+            pass  # 缓存不存在或已损坏，回退到解析YAML
+
+        with open(self.config_path, 'r', encoding='utf-8') as f:
+            user_config = yaml.load(f, Loader=_YamlLoader)
+
+        try:
+            with open(self.parsed_cache_path, 'wb') as f:
+                pickle.dump({'fingerprint': fingerprint, 'config': user_config}, f, protocol=pickle.HIGHEST_PROTOCOL)
+        except Exception as e:
+            logger.log_debug("[配置] 写入解析缓存失败: %s", e)
+        return user_config
+
     def _validate_config(self, user_config):
         """验证用户配置，并与默认值合并。"""
         config = self.defaults.copy()
@@ -91,25 +123,62 @@ class ConfigManager:
 
         return config
 
+    def _rebuild_flat(self):
+        """将嵌套配置展开为以点号路径为键的平铺字典，使 get() 只需一次字典查找。"""
+        # 先在局部变量中构建完整的索引再一次性替换，其他线程不会读到空的或构建到一半的索引
+        flat = {}
+        self._index_flat(flat, '', self.config)
+        self._flat = flat
+        self._whitelist_compiled = self._compile_whitelist(flat)
+
+    @staticmethod
+    def _compile_whitelist(flat):
+        """将白名单预编译为 {进程名: (模式, 延时秒数)}，供轮询热路径直接查表。"""
+        whitelist = flat.get('audio.whitelist') or {}
+        return {
+            sys.intern(str(app)): (settings.get('mode', 'normal'), settings.get('delay_seconds', 2))
+            for app, settings in whitelist.items()
+            if isinstance(settings, dict)
+        }
+
+    def whitelist_lookup(self, process_name):
+        """返回进程的 (模式, 延时秒数)；不在白名单中时返回 None。"""
+        return self._whitelist_compiled.get(process_name)
+
+    def _index_flat(self, flat, prefix, value):
+        """把 value 及其所有子项以 prefix 为前缀登记到平铺字典 flat 中。"""
+        if prefix:
+            flat[prefix] = value
+        if isinstance(value, dict):
+            for k, v in value.items():
+                self._index_flat(flat, f"{prefix}.{k}" if prefix else str(k), v)
+
     def get(self, key, default=None):
         """获取配置项的值。"""
-        keys = key.split('.')
-        value = self.config
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+        return self._flat.get(key, default)
 
     def set(self, key, value):
         """设置配置项的值。"""
         keys = key.split('.')
+        # 在副本上同步平铺字典，完成后再整体替换
+        flat = dict(self._flat)
         d = self.config
-        for k in keys[:-1]:
-            d = d.setdefault(k, {})
+        for i, k in enumerate(keys[:-1]):
+            if k not in d:
+                d[k] = {}
+                flat['.'.join(keys[:i + 1])] = d[k]
+            d = d[k]
         d[keys[-1]] = value
 
+        # 移除旧子树的索引后重新登记
+        subtree_prefix = key + '.'
+        for stale in [k for k in flat if k.startswith(subtree_prefix)]:
+            del flat[stale]
+        self._index_flat(flat, key, value)
+        self._flat = flat
+        if key == 'audio' or key.startswith('audio.whitelist'):
+            self._whitelist_compiled = self._compile_whitelist(flat)
+
     def save_config(self):
         """将当前配置保存到YAML文件。"""
         try:
@@ -123,6 +192,7 @@ class ConfigManager:
         """从文件重新加载配置。"""
         logger.log_info("正在重新加载配置文件...")
         self.config = self._load_config()
+        self._rebuild_flat()
 
 # 创建一个全局实例，方便其他模块调用
 config_manager = ConfigManager()
\ No newline at end of file
@@ -1,11 +1,110 @@
+import os
+import atexit
 import logging
 import threading
-from logging.handlers import QueueHandler
-from queue import Queue
+from collections import deque
 from datetime import datetime
 from pathlib import Path
 from concurrent.futures import ThreadPoolExecutor
 
+class FdLogWriter(logging.Handler):
+    """
+    Level/formatter holder for the log file that writes through a raw
+    O_APPEND file descriptor. Records are only ever written in batches by
+    BatchingLogHandler, so emit() is never used.
+    """
+    def __init__(self, path, level=logging.NOTSET):
+        super().__init__(level)
+        self.path = str(path)
+        self.fd = os.open(self.path, os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o644)
+
+    def write_lines(self, lines):
+        buf = ('\n'.join(lines) + '\n').encode('utf-8', 'replace')
+        view = memoryview(buf)
+        while view:
+            written = os.write(self.fd, view)
+            view = view[written:]
+
+    def emit(self, record):
+        self.write_lines([self.format(record)])
+
+    def close(self):
+        if self.fd is not None:
+            os.close(self.fd)
+            self.fd = None
+        super().close()
+
+class BatchingLogHandler(logging.Handler):
+    """
+    Collects records in a bounded in-memory buffer and writes them out in
+    batches from a single background thread.
+    Each target handler receives one write() and one flush() per batch
+    instead of one per record. When the buffer is full the oldest records
+    are dropped rather than blocking the caller.
+    """
+    def __init__(self, targets, capacity=8192, batch_size=64, flush_interval=0.5):
+        super().__init__(logging.DEBUG)
+        self.targets = targets
+        self.batch_size = batch_size
+        self.flush_interval = flush_interval
+        self._buffer = deque(maxlen=capacity)
+        self._buffer_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._stopping = False
+        self._thread = None
+
+    def start(self):
+        self._stopping = False
+        self._thread = threading.Thread(target=self._run, name='LoggerWriter', daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        """Stops the writer thread after draining all pending records."""
+        self._stopping = True
+        self._wakeup.set()
+        if self._thread:
+            self._thread.join()
+            self._thread = None
+        self._drain()
+
+    def emit(self, record):
+        with self._buffer_lock:
+            self._buffer.append(record)
+            pending = len(self._buffer)
+        if pending >= self.batch_size:
+            self._wakeup.set()
+
+    def _run(self):
+        while not self._stopping:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self._drain()
+
+    def _drain(self):
+        with self._buffer_lock:
+            if not self._buffer:
+                return
+            records = list(self._buffer)
+            self._buffer.clear()
+        for target in self.targets:
+            try:
+                self._write_batch(target, records)
+            except Exception:
+                # Never let a broken stream kill the writer thread.
+                pass
+
+    def _write_batch(self, target, records):
+        lines = [target.format(r) for r in records if r.levelno >= target.level]
+        if not lines:
+            return
+        write_lines = getattr(target, 'write_lines', None)
+        if write_lines:
+            write_lines(lines)
+            return
+        stream = target.stream
+        stream.write(target.terminator.join(lines) + target.terminator)
+        stream.flush()
+
 class AppLogger:
     """
     Manages application-wide logging.
@@ -32,9 +131,7 @@ class AppLogger:
                 return
             
             self._handler = None
-            self._env_details_logged = False
-            self._processing_queue = Queue(-1)
-            self._listener = None
+            self._batch_handler = None
             self._worker_pool = None
             self._is_initialized = True
             self.file_writer = None
@@ -65,10 +162,12 @@ class AppLogger:
         self._clean_logs(log_retention_days)
 
         self._handler = logging.getLogger("AudioFocusManagerApp")
-        self._handler.setLevel(logging.DEBUG)
+        # The logger level mirrors the handler levels so that disabled
+        # debug records are rejected before any formatting work.
+        self._handler.setLevel(logging.DEBUG if debug_mode else logging.INFO)
 
         log_file = self.log_directory / f"app_run_{datetime.now().strftime('%Y%m%d_%H%M%S')}.log"
-        self.file_writer = logging.FileHandler(log_file, encoding='utf-8')
+        self.file_writer = FdLogWriter(log_file)
         self.file_writer.setLevel(logging.DEBUG if debug_mode else logging.INFO)
 
         self.console_writer = logging.StreamHandler()
@@ -79,13 +178,15 @@ class AppLogger:
         self.file_writer.setFormatter(formatter)
         self.console_writer.setFormatter(formatter)
 
-        self._listener = logging.handlers.QueueListener(
-            self._processing_queue, self.file_writer, self.console_writer, respect_handler_level=True
-        )
-        self._listener.start()
+        self._batch_handler = BatchingLogHandler([self.file_writer, self.console_writer])
+        self._batch_handler.start()
+
+        self._handler.addHandler(self._batch_handler)
+        # Records are only written by the batch thread; make sure whatever is
+        # still buffered (e.g. the shutdown messages) reaches the file on exit.
+        atexit.register(self.shutdown)
+        self._log_environment()
 
-        self._handler.addHandler(QueueHandler(self._processing_queue))
-        
         self.log_debug("Logger setup complete.")
         self.log_debug(f"Logging level is {'DEBUG' if debug_mode else 'INFO'}.")
         self.log_debug(f"Logs are stored in: {self.log_directory}")
@@ -121,50 +222,50 @@ class AppLogger:
     def set_debug_mode(self, enabled):
         """Dynamically changes the logging level."""
         level = logging.DEBUG if enabled else logging.INFO
+        if self._handler:
+            self._handler.setLevel(level)
         if self.console_writer:
             self.console_writer.setLevel(level)
         if self.file_writer:
             self.file_writer.setLevel(level)
-        
-        # The QueueListener needs to be restarted to respect the new handler levels.
-        if self._listener:
-            self._listener.stop()
-            self._listener = logging.handlers.QueueListener(
-                self._processing_queue, self.file_writer, self.console_writer, respect_handler_level=True
-            )
-            self._listener.start()
+        # The batching handler reads the writer levels at write time, so no restart is needed.
         self.log_info(f"Log level dynamically set to {'DEBUG' if enabled else 'INFO'}.")
 
-    def log_error(self, *args, exc_info=True):
-        if self._handler:
-            message = " ".join(map(str, args))
-            self._handler.error(message, exc_info=exc_info)
+    # The log_* methods accept logging-style lazy arguments, e.g.
+    # log_debug("pid: %d", pid); the message is only formatted when the
+    # record is actually emitted.
 
-    def log_warning(self, *args):
-        if self._handler:
-            message = " ".join(map(str, args))
-            self._handler.warning(message)
+    def log_error(self, msg, *args, exc_info=True):
+        if self._handler and self._handler.isEnabledFor(logging.ERROR):
+            self._handler.error(msg, *args, exc_info=exc_info)
 
-    def log_info(self, *args):
-        if self._handler:
-            message = " ".join(map(str, args))
-            self._handler.info(message)
+    def log_warning(self, msg, *args):
+        if self._handler and self._handler.isEnabledFor(logging.WARNING):
+            self._handler.warning(msg, *args)
 
-    def log_debug(self, *args):
-        if self._handler:
-            if not self._env_details_logged:
-                self._log_environment()
-            message = " ".join(map(str, args))
-            self._handler.debug(message)
+    def log_info(self, msg, *args):
+        if self._handler and self._handler.isEnabledFor(logging.INFO):
+            self._handler.info(msg, *args)
+
+    def log_debug(self, msg, *args):
+        if self._handler and self._handler.isEnabledFor(logging.DEBUG):
+            self._handler.debug(msg, *args)
 
     def shutdown(self):
-        if self._listener:
-            self._listener.stop()
+        """Flushes pending records and releases resources. Safe to call more than once."""
+        if self._batch_handler:
+            self._handler.removeHandler(self._batch_handler)
+            self._batch_handler.stop()
+            self._batch_handler = None
+        if self.file_writer:
+            self.file_writer.close()
+            self.file_writer = None
         if self._worker_pool:
             self._worker_pool.shutdown(wait=True)
+            self._worker_pool = None
 
     def _log_environment(self):
-        import platform, os, sys
+        import platform, sys
         env_specs = [
             f"Platform: {platform.system()} {platform.release()}",
             f"Python: {sys.version}",
@@ -172,7 +273,6 @@ class AppLogger:
         ]
         for spec in env_specs:
             self._handler.debug(spec)
-        self._env_details_logged = True
 
 # Global singleton logger instance
 logger = AppLogger()
@@ -1,12 +1,39 @@
 import asyncio
+from functools import lru_cache
 from winrt.windows.media.control import \
     GlobalSystemMediaTransportControlsSessionManager as MediaManager
 from logger import logger
 
+# GlobalSystemMediaTransportControlsSessionPlaybackStatus 枚举值到状态字符串的映射
+_STATUS_MAP = {3: "Stopped", 4: "Playing", 5: "Paused"}
+
+@lru_cache(maxsize=128)
+def _parse_source(source_id):
+    """
+    尝试从 SourceAppUserModelId 中提取一个可读的应用名称。
+    来源ID集合很小且固定，结果按来源ID缓存。
+    """
+    if '!' in source_id:
+        app_part = source_id.split('!')[0]
+        parts = app_part.split('.')
+        if len(parts) > 1:
+            name = parts[1].split('_')[0]
+            return name
+    
+    parts = source_id.split('.')
+    if len(parts) > 0:
+        name = parts[0]
+        if name.endswith("AB"):
+            name = name[:-2]
+        return name
+        
+    return source_id
+
 class MediaController:
     def __init__(self):
         self.manager = None
-        self.loop = asyncio.get_event_loop()
+        # source_app_user_model_id -> 会话对象，由最近一次 get_media_sessions 刷新
+        self._session_by_source = {}
 
     async def initialize(self):
         """异步初始化MediaManager。"""
@@ -25,21 +52,7 @@ class MediaController:
         """
         尝试从 SourceAppUserModelId 中提取一个可读的应用名称。
         """
-        if '!' in source_id:
-            app_part = source_id.split('!')[0]
-            parts = app_part.split('.')
-            if len(parts) > 1:
-                name = parts[1].split('_')[0]
-                return name
-        
-        parts = source_id.split('.')
-        if len(parts) > 0:
-            name = parts[0]
-            if name.endswith("AB"):
-                name = name[:-2]
-            return name
-            
-        return source_id
+        return _parse_source(source_id)
 
     async def get_media_sessions(self):
         """
@@ -54,20 +67,26 @@ class MediaController:
         sessions_list = []
         try:
             sessions = self.manager.get_sessions()
-            logger.log_debug(f"[媒体控制器] 发现 {len(sessions)} 个媒体会话")
+            logger.log_debug("[媒体控制器] 发现 %d 个媒体会话", len(sessions))
             
-            for session in sessions:
+            # 各会话的属性查询相互独立，并发发起以避免逐个等待 IPC 往返
+            sessions = list(sessions)
+            infos = await asyncio.gather(
+                *(session.try_get_media_properties_async() for session in sessions),
+                return_exceptions=True
+            )
+
+            self._session_by_source = {session.source_app_user_model_id: session for session in sessions}
+
+            for session, info in zip(sessions, infos):
                 try:
-                    info = await session.try_get_media_properties_async()
+                    if isinstance(info, BaseException):
+                        raise info
                     playback_info = session.get_playback_info()
                     if info and playback_info:
                         display_name = self.get_app_name_from_source(session.source_app_user_model_id)
                         
-                        status = playback_info.playback_status
-                        status_str = "Unknown"
-                        if status == 4: status_str = "Playing"
-                        elif status == 5: status_str = "Paused"
-                        elif status == 3: status_str = "Stopped"
+                        status_str = _STATUS_MAP.get(playback_info.playback_status, "Unknown")
 
                         session_info = {
                             "source": session.source_app_user_model_id,
@@ -77,14 +96,14 @@ class MediaController:
                             "status": status_str
                         }
                         sessions_list.append(session_info)
-                        logger.log_debug(f"[媒体控制器] 会话添加: {display_name} - {info.title} ({status_str})")
+                        logger.log_debug("[媒体控制器] 会话添加: %s - %s (%s)", display_name, info.title, status_str)
                 except Exception as e:
                     logger.log_error(f"[媒体控制器] 获取会话属性失败: {str(e)}")
                     continue
         except Exception as e:
             logger.log_error(f"[媒体控制器] 获取媒体会话时出错: {str(e)}")
         
-        logger.log_debug(f"[媒体控制器] 获取完成，共 {len(sessions_list)} 个有效会话")
+        logger.log_debug("[媒体控制器] 获取完成，共 %d 个有效会话", len(sessions_list))
         return sessions_list
 
     async def control_media(self, app_id, command):
@@ -96,18 +115,19 @@ class MediaController:
             logger.log_warning("[媒体控制器] MediaManager 未初始化。")
             return
 
-        logger.log_debug(f"[媒体控制器] 尝试对 app_id '{app_id}' 执行 '{command}'")
+        logger.log_debug("[媒体控制器] 尝试对 app_id '%s' 执行 '%s'", app_id, command)
+        target_session = self._session_by_source.get(app_id)
         try:
-            sessions = self.manager.get_sessions()
-            
-            target_session = None
-            for session in sessions:
-                if session.source_app_user_model_id == app_id:
-                    target_session = session
-                    break
+            if target_session is None:
+                # 缓存中没有时才重新枚举会话
+                for session in self.manager.get_sessions():
+                    if session.source_app_user_model_id == app_id:
+                        target_session = session
+                        self._session_by_source[app_id] = session
+                        break
             
             if target_session:
-                logger.log_debug(f"[媒体控制器] 找到会话，发送命令: {command}")
+                logger.log_debug("[媒体控制器] 找到会话，发送命令: %s", command)
                 if command == 'play':
                     await target_session.try_play_async()
                     logger.log_debug("[媒体控制器] 播放命令已发送")
@@ -118,4 +138,6 @@ class MediaController:
                 logger.log_warning(f"[媒体控制器] 未找到 app_id 为 '{app_id}' 的会话")
                 
         except Exception as e:
-            logger.log_error(f"[媒体控制器] 命令执行失败: {str(e)}")
\ No newline at end of file
+            # 缓存的会话可能已失效，丢弃后下次重新枚举
+            self._session_by_source.pop(app_id, None)
+            logger.log_error(f"[媒体控制器] 命令执行失败: {str(e)}")
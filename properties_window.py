@@ -1,37 +1,28 @@
 import tkinter as tk
 from tkinter import ttk
 
+_UNSET = object()
+
 class PropertiesWindow(tk.Toplevel):
     def __init__(self, parent, app_info):
         super().__init__(parent)
-        self.title(f"属性 - {app_info.get('display_name', 'N/A')}")
+        self._last_title = f"属性 - {app_info.get('display_name', 'N/A')}"
+        self.title(self._last_title)
         self.resizable(False, False)
         self.transient(parent)
-        self.grab_set()
+        # 构建期间先隐藏窗口，所有控件就绪后只做一次布局再显示
+        self.withdraw()
 
-        # Configure style for a white background and clearer fonts
+        # ttk 样式由主程序启动时统一配置，这里只设置窗口背景
         self.configure(bg='white')
-        style = ttk.Style(self)
-        try:
-            # 'clam' or 'alt' themes are more customizable
-            style.theme_use('clam')
-        except tk.TclError:
-            # Fallback to default if 'clam' is not available
-            style.theme_use('default')
-
-        style.configure('.', background='white', foreground='black', font=('Segoe UI', 10))
-        style.configure('TFrame', background='white')
-        style.configure('TLabel', background='white')
-        style.configure('Bold.TLabel', font=('Segoe UI', 10, 'bold'))
-        style.configure('TProgressbar', troughcolor='#EAEAEA', background='#0078D7')
-        style.configure('TButton', font=('Segoe UI', 10), padding=5)
-        style.map('TButton', background=[('active', '#E5F1FB')])
-
 
         self.app_info = app_info
         self.peak_value_var = tk.StringVar(value="N/A")
-        self.loudness_percentage_var = tk.StringVar(value="0%")
-        self.loudness_progress_var = tk.DoubleVar(value=0.0)
+        # 峰值刷新节流：最多约每 33ms（约30次/秒）刷新一次显示
+        self._pending_peak = None
+        self._peak_after_id = None
+        self._last_peak_text = None
+        self._last_percentage_text = None
 
         main_frame = ttk.Frame(self, padding="15", style='TFrame')
         main_frame.pack(expand=True, fill="both")
@@ -50,6 +41,8 @@ class PropertiesWindow(tk.Toplevel):
         x = root_x + (root_w - win_w) // 2
         y = root_y + (root_h - win_h) // 2
         self.geometry(f'+{x}+{y}')
+        self.deiconify()
+        self.grab_set()
 
     def create_widgets(self, parent):
         parent.columnconfigure(1, weight=1)
@@ -65,6 +58,7 @@ class PropertiesWindow(tk.Toplevel):
         ]
         
         self.info_labels = {}
+        self._label_texts = {}
         for i, (label_text, data_key) in enumerate(fields):
             label = ttk.Label(parent, text=label_text, style='Bold.TLabel')
             label.grid(row=i, column=0, sticky="w", pady=4, padx=5)
@@ -92,14 +86,14 @@ class PropertiesWindow(tk.Toplevel):
             orient="horizontal",
             length=200,
             mode="determinate",
-            variable=self.loudness_progress_var,
+            value=0.0,
             style='TProgressbar'
         )
         self.progressbar.grid(row=0, column=0, sticky="we")
 
         self.percentage_label = ttk.Label(
             loudness_frame,
-            textvariable=self.loudness_percentage_var,
+            text="0%",
             style='TLabel'
         )
         self.percentage_label.grid(row=0, column=1, sticky="w", padx=(5, 0))
@@ -110,27 +104,58 @@ class PropertiesWindow(tk.Toplevel):
 
     def update_info(self, new_app_info):
         self.app_info = new_app_info
-        self.title(f"属性 - {self.app_info.get('display_name', 'N/A')}")
+        # 标题与各字段仅在内容变化时才重新设置，避免无意义的重绘
+        title = f"属性 - {self.app_info.get('display_name', 'N/A')}"
+        if title != self._last_title:
+            self._last_title = title
+            self.title(title)
 
         for key, label in self.info_labels.items():
-            label.config(text=self.app_info.get(key, "N/A"))
+            text = self.app_info.get(key, "N/A")
+            if self._label_texts.get(key, _UNSET) != text:
+                self._label_texts[key] = text
+                label.config(text=text)
         
         # 单独更新峰值
         self.update_peak_value(self.app_info.get('peak_value', 0))
 
     def update_peak_value(self, peak_value):
-        """专门用于更新音频峰值和响度显示的方法。"""
+        """专门用于更新音频峰值和响度显示的方法。实际写入被合并到下一次节流刷新中。"""
+        self._pending_peak = peak_value
+        if self._last_peak_text is None:
+            # 首次显示立即写入，避免窗口出现时短暂显示占位值
+            self._flush_peak()
+        elif self._peak_after_id is None:
+            self._peak_after_id = self.after(33, self._flush_peak)
+
+    def _flush_peak(self):
+        """将最近一次的峰值写入显示变量，跳过与上次相同的文本。"""
+        self._peak_after_id = None
         if not self.winfo_exists():
             return
-        
+
+        peak_value = self._pending_peak
         if peak_value is not None:
-            # 更新原始峰值
-            self.peak_value_var.set(f"{peak_value:.4f}")
-            # 计算并更新响度百分比和进度条
+            # 原始峰值与计算出的响度百分比
+            peak_text = f"{peak_value:.4f}"
             percentage = peak_value * 100
-            self.loudness_progress_var.set(percentage)
-            self.loudness_percentage_var.set(f"{percentage:.0f}%")
+            percentage_text = f"{percentage:.0f}%"
         else:
-            self.peak_value_var.set("N/A")
-            self.loudness_progress_var.set(0)
-            self.loudness_percentage_var.set("N/A")
+            peak_text = "N/A"
+            percentage = 0
+            percentage_text = "N/A"
+
+        if peak_text != self._last_peak_text:
+            self._last_peak_text = peak_text
+            self.peak_value_var.set(peak_text)
+        if percentage_text != self._last_percentage_text:
+            self._last_percentage_text = percentage_text
+            # 直接配置控件，避免 Tk 变量的 trace 分发
+            self.progressbar.configure(value=percentage)
+            self.percentage_label.configure(text=percentage_text)
+
+    def destroy(self):
+        if self._peak_after_id is not None:
+            self.after_cancel(self._peak_after_id)
+            self._peak_after_id = None
+        super().destroy()
@@ -1,11 +1,69 @@
 import tkinter as tk
 from tkinter import ttk
+from collections import OrderedDict
+
+_PLAYING = "▶️ 播放中"
+_SILENT = "⏹️ 静默"
+
+def prepare_whitelist_data(whitelist, all_audio_apps):
+    """
+    合并当前已知应用与白名单中的应用，并按显示名称、进程名排序。
+    不涉及任何 Tk 对象，可在后台线程中执行。
+    """
+    # 使用 process_name 作为字典的键，因为它更唯一；同时一次性算好排序键
+    apps = {}
+    sort_keys = {}
+    for app in all_audio_apps:
+        process_name = app.get('process_name')
+        if process_name:
+            apps[process_name] = app
+            display_name = app.get('display_name') or process_name
+            sort_keys[process_name] = (display_name.lower(), process_name.lower())
+
+    # 将白名单中但当前未运行的应用也加入到显示列表
+    for process_name in whitelist:
+        if process_name not in apps:
+            apps[process_name] = {
+                'process_name': process_name,
+                'display_name': process_name, # 回退到显示进程名
+                'is_playing': False,
+                'icon': None
+            }
+            sort_keys[process_name] = (process_name.lower(), process_name.lower())
+
+    return OrderedDict((k, apps[k]) for k in sorted(apps, key=sort_keys.__getitem__))
+
+# 进程名 -> (原始图标, PhotoImage)。跨窗口共享，重新打开设置窗口时无需再次缩放
+ICON_CACHE_SIZE = 256
+_icon_cache = OrderedDict()
+
+def get_whitelist_photo(process_name, icon):
+    """按进程名获取缩放到 32px 的 PhotoImage；图标对象变化时重新生成。"""
+    cached = _icon_cache.get(process_name)
+    if cached is not None and cached[0] is icon:
+        _icon_cache.move_to_end(process_name)
+        return cached[1]
+
+    # 仅在真正需要缩放图标时才导入 PIL，导入本模块时不加载
+    from PIL import Image, ImageTk
+
+    # 32px 的结果上 BILINEAR 与 LANCZOS 肉眼无差别，但快得多
+    width, height = icon.size
+    if width == height and width > 32:
+        # 方形图标直接缩放，resize 本身返回新图像，无需先复制
+        img_copy = icon.resize((32, 32), Image.Resampling.BILINEAR)
+    else:
+        img_copy = icon.copy()
+        img_copy.thumbnail((32, 32), Image.Resampling.BILINEAR)
+    photo = ImageTk.PhotoImage(img_copy)
+    if process_name:
+        _icon_cache[process_name] = (icon, photo)
+        _icon_cache.move_to_end(process_name)
+        if len(_icon_cache) > ICON_CACHE_SIZE:
+            _icon_cache.popitem(last=False)
+    return photo
 
-from PIL import Image, ImageTk
-
-class WhitelistEntry(tk.Frame):
-    """在白名单设置中显示单个应用的控件。"""
-    
+class SettingsWindow(tk.Toplevel):
     # 中英文模式映射
     MODE_MAP = {
         "正常": "normal",
@@ -14,109 +72,6 @@ class WhitelistEntry(tk.Frame):
     }
     REVERSE_MODE_MAP = {v: k for k, v in MODE_MAP.items()}
 
-    def __init__(self, parent, app_info, current_settings, on_update_callback):
-        super().__init__(parent, bg="white", highlightbackground="#e0e0e0", highlightthickness=1)
-        self.app_info = app_info
-        self.on_update_callback = on_update_callback
-        self.photo = None
-
-        # --- UI 变量 ---
-        # 从配置中获取英文mode，转换为中文显示
-        initial_mode_english = current_settings.get('mode', 'normal')
-        initial_mode_chinese = self.REVERSE_MODE_MAP.get(initial_mode_english, "正常")
-        self.mode_var = tk.StringVar(value=initial_mode_chinese)
-        self.delay_var = tk.IntVar(value=current_settings.get('delay_seconds', 2))
-
-        self.grid_columnconfigure(1, weight=1)
-
-        # --- 图标和标签 ---
-        self.icon_label = tk.Label(self, bg="white")
-        self.icon_label.grid(row=0, column=0, rowspan=2, padx=(10, 5), pady=5, sticky="nsew")
-        self._update_icon(app_info.get('icon'))
-
-        display_name = app_info.get('display_name', app_info.get('name', 'Unknown App'))
-        self.name_label = tk.Label(self, text=display_name, anchor="w", bg="white", font=("Segoe UI", 10, "bold"))
-        self.name_label.grid(row=0, column=1, sticky="ew", padx=5)
-
-        process_name = app_info.get('process_name', app_info.get('name', 'N/A'))
-        status_icon = "▶️ 播放中" if app_info.get('is_playing') else "⏹️ 静默"
-        status_text = f"{process_name}  •  {status_icon}"
-        self.status_label = tk.Label(self, text=status_text, anchor="w", bg="white", fg="gray", font=("Segoe UI", 8))
-        self.status_label.grid(row=1, column=1, sticky="ew", padx=5)
-
-        # --- 控制器 ---
-        control_frame = ttk.Frame(self)
-        control_frame.grid(row=0, column=2, rowspan=2, padx=10, pady=5)
-
-        self.mode_combo = ttk.Combobox(control_frame, textvariable=self.mode_var, values=list(self.MODE_MAP.keys()), state="readonly", width=8)
-        self.mode_combo.grid(row=0, column=0, padx=(0, 5))
-        self.mode_combo.bind("<<ComboboxSelected>>", self._on_update)
-
-        self.delay_label = ttk.Label(control_frame, text="延时(秒):", background="white")
-        self.delay_spinbox = ttk.Spinbox(control_frame, from_=1, to=60, textvariable=self.delay_var, width=4, command=self._on_update)
-
-        self._toggle_delay_widgets()
-
-    def _update_icon(self, icon):
-        if icon:
-            try:
-                img_copy = icon.copy()
-                img_copy.thumbnail((32, 32), Image.Resampling.LANCZOS)
-                self.photo = ImageTk.PhotoImage(img_copy)
-                self.icon_label.config(image=self.photo, text="")
-            except Exception:
-                self.icon_label.config(image='', text="🖼️")
-        else:
-            self.icon_label.config(image='', text="🎵")
-
-    def _toggle_delay_widgets(self, event=None):
-        """根据模式显示或隐藏延时设置。"""
-        if self.mode_var.get() == "延时":
-            self.delay_label.grid(row=0, column=1, padx=(5, 2))
-            self.delay_spinbox.grid(row=0, column=2)
-        else:
-            self.delay_label.grid_remove()
-            self.delay_spinbox.grid_remove()
-
-    def _on_update(self, event=None):
-        """当任何设置改变时调用回调函数。"""
-        self._toggle_delay_widgets()
-        if self.on_update_callback:
-            # 将UI选择的中文模式转换为英文内部值
-            selected_mode_chinese = self.mode_var.get()
-            mode_english = self.MODE_MAP.get(selected_mode_chinese, 'normal')
-            
-            new_settings = {
-                'mode': mode_english,
-                'delay_seconds': self.delay_var.get()
-            }
-            # 使用 process_name 作为唯一标识符
-            process_name = self.app_info.get('process_name', self.app_info.get('name'))
-            if process_name:
-                self.on_update_callback(process_name, new_settings)
-
-    def destroy(self):
-        """销毁控件时清理图像引用。"""
-        if hasattr(self, 'icon_label') and self.icon_label.winfo_exists():
-            self.icon_label.config(image='')
-            self.icon_label.image = None
-        self.photo = None
-        self.on_update_callback = None
-        super().destroy()
-
-    def update_status(self, app_info):
-        """仅更新此条目的播放状态，而不重新创建整个控件。"""
-        if not self.winfo_exists():
-            return
-        
-        self.app_info.update(app_info) # 更新内部信息
-        
-        process_name = self.app_info.get('process_name', 'N/A')
-        status_icon = "▶️ 播放中" if self.app_info.get('is_playing') else "⏹️ 静默"
-        status_text = f"{process_name}  •  {status_icon}"
-        self.status_label.config(text=status_text)
-
-class SettingsWindow(tk.Toplevel):
     def __init__(self, parent):
         super().__init__(parent)
         self.title("设置")
@@ -128,9 +83,16 @@ class SettingsWindow(tk.Toplevel):
         self.was_saved = False
         self.saved_values = None
         self.parent = parent
-        self.all_audio_apps = {}
+        self.all_audio_apps = OrderedDict()
         self.whitelist = {}
-        self.whitelist_entries = {}
+        # 白名单列表中每一行（以进程名为 iid）当前显示的播放状态
+        self._row_status = {}
+        # 每行使用的图标，需持有引用以免 PhotoImage 被回收
+        self._row_photos = {}
+        self._entry_order = []
+        self._last_apps_snapshot = {}
+        # 正在编辑的单元格：(编辑控件, iid, 列, 变量)
+        self._editor = None
 
         # 创建UI变量
         self.always_on_top_var = tk.BooleanVar()
@@ -225,66 +187,179 @@ class SettingsWindow(tk.Toplevel):
         list_frame.rowconfigure(0, weight=1)
         list_frame.columnconfigure(0, weight=1)
 
-        canvas = tk.Canvas(list_frame, highlightthickness=0)
-        scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=canvas.yview)
-        self.scrollable_frame = ttk.Frame(canvas)
-
-        canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw")
-        canvas.configure(yscrollcommand=scrollbar.set)
+        # 所有应用以行的形式显示在同一个 Treeview 中，控件数量不随应用数增长；
+        # 模式/延时通过双击单元格时临时放置的编辑控件修改
+        self.tree = ttk.Treeview(
+            list_frame,
+            columns=("process", "status", "mode", "delay"),
+            show="tree headings",
+            selectmode="browse",
+            style='Whitelist.Treeview' # 样式由主程序启动时配置
+        )
+        self.tree.heading("#0", text="应用", anchor="w")
+        self.tree.heading("process", text="进程", anchor="w")
+        self.tree.heading("status", text="状态", anchor="w")
+        self.tree.heading("mode", text="模式（双击修改）", anchor="w")
+        self.tree.heading("delay", text="延时(秒)", anchor="w")
+        self.tree.column("#0", width=200, stretch=True)
+        self.tree.column("process", width=140, stretch=True)
+        self.tree.column("status", width=90, stretch=False)
+        self.tree.column("mode", width=110, stretch=False)
+        self.tree.column("delay", width=70, stretch=False)
+
+        self._tree_first = None
+        self._tree_scrollbar = ttk.Scrollbar(list_frame, orient="vertical", command=self.tree.yview)
+        self.tree.configure(yscrollcommand=self._on_tree_scroll)
+
+        self.tree.grid(row=0, column=0, sticky="nsew")
+        self._tree_scrollbar.grid(row=0, column=1, sticky="ns")
+
+        self.tree.bind("<Double-1>", self._on_tree_double_click)
+        self.tree.bind("<Button-1>", lambda e: self._close_editor(commit=True), add="+")
+
+    def _on_tree_scroll(self, first, last):
+        """同步滚动条；视图滚动后编辑控件不再对齐单元格，直接提交并关闭。"""
+        self._tree_scrollbar.set(first, last)
+        if first != self._tree_first:
+            self._tree_first = first
+            self._close_editor(commit=True)
+
+    def _get_row_settings(self, process_name):
+        """返回进程当前的 (英文模式, 延时秒数)。"""
+        settings = self.whitelist.get(process_name, {})
+        return settings.get('mode', 'normal'), settings.get('delay_seconds', 2)
+
+    def _mode_cells(self, process_name):
+        """返回“模式”和“延时”两列的显示文本。"""
+        mode, delay = self._get_row_settings(process_name)
+        return self.REVERSE_MODE_MAP.get(mode, "正常"), (delay if mode == 'delay' else "")
+
+    def _on_tree_double_click(self, event):
+        """在被双击的模式/延时单元格上放置编辑控件。"""
+        self._close_editor(commit=True)
+        iid = self.tree.identify_row(event.y)
+        column = self.tree.identify_column(event.x)
+        if not iid or column not in ("#3", "#4"):
+            return
+        mode, delay = self._get_row_settings(iid)
+        if column == "#4" and mode != 'delay':
+            return
+        bbox = self.tree.bbox(iid, column)
+        if not bbox:
+            return
+        x, y, width, height = bbox
 
-        canvas.grid(row=0, column=0, sticky="nsew")
-        scrollbar.grid(row=0, column=1, sticky="ns")
+        if column == "#3":
+            var = tk.StringVar(value=self.REVERSE_MODE_MAP.get(mode, "正常"))
+            editor = ttk.Combobox(self.tree, textvariable=var, values=list(self.MODE_MAP.keys()), state="readonly")
+            editor.bind("<<ComboboxSelected>>", lambda e: self._close_editor(commit=True))
+        else:
+            var = tk.IntVar(value=delay)
+            # 点击箭头不会让 Spinbox 获得焦点，因此每次调整都立即写回
+            editor = ttk.Spinbox(self.tree, from_=1, to=60, textvariable=var,
+                                 command=self._write_back_editor)
+            editor.bind("<Return>", lambda e: self._close_editor(commit=True))
+            # 下拉框弹出列表时也会失去焦点，因此只为 Spinbox 绑定 FocusOut
+            editor.bind("<FocusOut>", lambda e: self._close_editor(commit=True))
+        editor.bind("<Escape>", lambda e: self._close_editor())
+        editor.place(x=x, y=y, width=width, height=height)
+        editor.focus_set()
+        self._editor = (editor, iid, column, var)
+
+    def _write_back_editor(self):
+        """将编辑控件的当前值写回设置，不关闭编辑控件。"""
+        if self._editor is None:
+            return
+        _, iid, column, var = self._editor
+        mode, delay = self._get_row_settings(iid)
+        try:
+            if column == "#3":
+                mode = self.MODE_MAP.get(var.get(), 'normal')
+            else:
+                delay = max(1, min(int(var.get()), 60))
+        except (tk.TclError, ValueError):
+            pass
+        self._on_update_whitelist(iid, {'mode': mode, 'delay_seconds': delay})
+        if self.tree.exists(iid):
+            mode_text, delay_text = self._mode_cells(iid)
+            self.tree.set(iid, "mode", mode_text)
+            self.tree.set(iid, "delay", delay_text)
+
+    def _close_editor(self, commit=False):
+        """关闭当前的单元格编辑控件，commit 为 True 时写回设置。"""
+        if self._editor is None:
+            return
+        if commit:
+            self._write_back_editor()
+        editor = self._editor[0]
+        self._editor = None
+        editor.destroy()
+
+    def _set_row_status(self, process_name, is_playing):
+        """更新一行的播放状态；状态未变化时不触发 Tcl 调用。"""
+        if self._row_status.get(process_name) == is_playing:
+            return
+        self._row_status[process_name] = is_playing
+        self.tree.set(process_name, "status", _PLAYING if is_playing else _SILENT)
 
-        self.scrollable_frame.bind("<Configure>", lambda e: canvas.configure(scrollregion=canvas.bbox("all")))
-        canvas.bind('<Configure>', lambda e: canvas.itemconfig(canvas.create_window((0, 0), window=self.scrollable_frame, anchor="nw"), width=e.width))
-        
-    def set_initial_values(self, debug, top, retention, whitelist, all_audio_apps, ignore_manual_pause):
-        """从主程序接收当前的临时设置值。"""
+    def set_initial_values(self, debug, top, retention, whitelist, ignore_manual_pause):
+        """从主程序接收当前的临时设置值。应用列表随后通过 apply_prepared_apps 提供。"""
         self.debug_mode_var.set(debug)
         self.always_on_top_var.set(top)
         self.log_retention_days_var.set(retention)
         self.ignore_manual_pause_var.set(ignore_manual_pause)
         
         self.whitelist = whitelist.copy()
-        # 使用 process_name 作为字典的键，因为它更唯一
-        self.all_audio_apps = {
-            app['process_name']: app
-            for app in all_audio_apps
-            if app.get('process_name')
-        }
-        
-        # 将白名单中但当前未运行的应用也加入到显示列表
-        for process_name, settings in self.whitelist.items():
-            if process_name not in self.all_audio_apps:
-                self.all_audio_apps[process_name] = {
-                    'process_name': process_name,
-                    'display_name': process_name, # 回退到显示进程名
-                    'is_playing': False,
-                    'icon': None
-                }
 
+    def apply_prepared_apps(self, prepared_apps):
+        """接收 prepare_whitelist_data 在后台线程中整理好的（已排序的）应用列表。"""
+        self.all_audio_apps = prepared_apps
+        self._last_apps_snapshot = {
+            process_name: bool(app.get('is_playing'))
+            for process_name, app in prepared_apps.items()
+        }
         self._update_whitelist_display()
 
     def _update_whitelist_display(self):
-        """根据当前数据更新白名单UI。"""
-        for entry in self.whitelist_entries.values():
-            entry.destroy()
-        self.whitelist_entries.clear()
-        
-        # 按显示名称排序，如果显示名称相同，则按进程名排序
-        sorted_app_items = sorted(
-            self.all_audio_apps.values(),
-            key=lambda app: (app.get('display_name', '').lower(), app.get('process_name', '').lower())
-        )
-        
-        for app_info in sorted_app_items:
-            process_name = app_info.get('process_name')
-            if not process_name:
+        """根据当前数据更新白名单UI。只插入/删除增减的行，保留的行原地更新。"""
+        # all_audio_apps 已按显示名称、进程名排好序
+        new_keys = list(self.all_audio_apps)
+
+        # 删除已不在列表中的行
+        for process_name in [k for k in self._row_status if k not in self.all_audio_apps]:
+            self.tree.delete(process_name)
+            del self._row_status[process_name]
+            self._row_photos.pop(process_name, None)
+
+        for process_name in new_keys:
+            app_info = self.all_audio_apps[process_name]
+            is_playing = bool(app_info.get('is_playing'))
+            if process_name in self._row_status:
+                self._set_row_status(process_name, is_playing)
                 continue
-            current_settings = self.whitelist.get(process_name, {})
-            entry = WhitelistEntry(self.scrollable_frame, app_info, current_settings, self._on_update_whitelist)
-            entry.pack(fill="x", pady=2, padx=2)
-            self.whitelist_entries[process_name] = entry
+
+            photo = None
+            icon = app_info.get('icon')
+            if icon:
+                try:
+                    photo = get_whitelist_photo(process_name, icon)
+                except Exception:
+                    photo = None
+            self._row_photos[process_name] = photo
+
+            mode_text, delay_text = self._mode_cells(process_name)
+            display_name = app_info.get('display_name') or process_name
+            self.tree.insert(
+                "", "end", iid=process_name, text=display_name, image=photo or "",
+                values=(process_name, _PLAYING if is_playing else _SILENT, mode_text, delay_text)
+            )
+            self._row_status[process_name] = is_playing
+
+        # 仅在顺序变化时重新排列
+        if new_keys != self._entry_order:
+            for index, process_name in enumerate(new_keys):
+                self.tree.move(process_name, "", index)
+            self._entry_order = new_keys
 
     def _on_update_whitelist(self, process_name, new_settings):
         """处理白名单条目设置的更新。"""
@@ -299,19 +374,22 @@ class SettingsWindow(tk.Toplevel):
         if not self.winfo_exists():
             return
             
-        apps_by_process_name = {
-            app['process_name']: app
+        # 本次各进程的播放状态快照；不在列表中的条目视为静默
+        snapshot = {
+            app['process_name']: bool(app.get('is_playing'))
             for app in all_audio_apps
             if app.get('process_name')
         }
+        last_snapshot = self._last_apps_snapshot
+        self._last_apps_snapshot = snapshot
 
-        for process_name, entry in self.whitelist_entries.items():
-            if process_name in apps_by_process_name:
-                latest_info = apps_by_process_name[process_name]
-                entry.update_status(latest_info)
-            else:
-                # 如果应用已不在播放列表中，则将其标记为静默
-                entry.update_status({'is_playing': False})
+        # 只处理状态发生变化或从列表中消失/出现的进程
+        changed_keys = {k for k, playing in snapshot.items() if last_snapshot.get(k) != playing}
+        changed_keys.update(k for k in last_snapshot if k not in snapshot)
+
+        for process_name in changed_keys:
+            if process_name in self._row_status:
+                self._set_row_status(process_name, snapshot.get(process_name, False))
 
     def get_values(self):
         """返回UI控件的当前值。"""
@@ -330,6 +408,8 @@ class SettingsWindow(tk.Toplevel):
 
     def save_and_close(self):
         """获取当前值，标记为已保存，然后调用父窗口的关闭处理程序。"""
+        # 点击按钮不会转移焦点，先提交仍处于编辑中的单元格
+        self._close_editor(commit=True)
         self.was_saved = True
         self.saved_values = self.get_values()
         # 调用父窗口的关闭处理程序，而不是直接销毁
@@ -343,10 +423,11 @@ class SettingsWindow(tk.Toplevel):
             self.parent._on_settings_window_close()
 
     def destroy(self):
-        """销毁窗口时，确保所有子控件也被正确销毁。"""
-        for entry in self.whitelist_entries.values():
-            entry.destroy()
-        self.whitelist_entries.clear()
+        """销毁窗口时释放行状态与图标引用。"""
+        self._close_editor()
+        self._row_status.clear()
+        self._row_photos.clear()
+        self._entry_order = []
         super().destroy()
 
     def center_window(self):
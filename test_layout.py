@@ -12,19 +12,40 @@ def set_dpi_awareness():
         except (AttributeError, OSError):
             print("警告：无法设置DPI感知。")
 
+# 在导入时一次性绑定 GDI 函数并声明参数类型，调用时无需再经由 windll 查找
+try:
+    _user32 = ctypes.windll.user32
+    _gdi32 = ctypes.windll.gdi32
+    _GetDC = _user32.GetDC
+    _GetDC.argtypes = [ctypes.c_void_p]
+    _GetDC.restype = ctypes.c_void_p
+    _ReleaseDC = _user32.ReleaseDC
+    _ReleaseDC.argtypes = [ctypes.c_void_p, ctypes.c_void_p]
+    _ReleaseDC.restype = ctypes.c_int
+    _GetDeviceCaps = _gdi32.GetDeviceCaps
+    _GetDeviceCaps.argtypes = [ctypes.c_void_p, ctypes.c_int]
+    _GetDeviceCaps.restype = ctypes.c_int
+except (AttributeError, OSError):
+    _GetDC = _ReleaseDC = _GetDeviceCaps = None
+
 def get_dpi_scale_factor():
+    if _GetDC is None:
+        return 1.0
     try:
         # 获取主屏幕的设备上下文
-        hdc = ctypes.windll.user32.GetDC(0)
+        hdc = _GetDC(None)
         # 获取水平方向的DPI
-        dpi = ctypes.windll.gdi32.GetDeviceCaps(hdc, 88) # 88 for LOGPIXELSX
+        dpi = _GetDeviceCaps(hdc, 88) # 88 for LOGPIXELSX
         # 释放设备上下文
-        ctypes.windll.user32.ReleaseDC(0, hdc)
+        _ReleaseDC(None, hdc)
         return dpi / 96.0  # 96 DPI is the standard
     except Exception:
         return 1.0 # Fallback
 
 class AppEntry(tk.Frame):
+    # icon_size -> 占位图标 PhotoImage，同一缩放比例下所有条目共享
+    _placeholder_cache = {}
+
     def __init__(self, parent, scale_factor=1.0):
         super().__init__(parent, borderwidth=2, relief="groove")
         self.default_bg = self.cget("background")
@@ -38,8 +59,10 @@ class AppEntry(tk.Frame):
         self.grid_columnconfigure(1, weight=1)
 
         # --- Placeholder Icon ---
-        placeholder_icon = Image.new("RGBA", (icon_size, icon_size), "blue")
-        self.photo = ImageTk.PhotoImage(placeholder_icon)
+        if icon_size not in AppEntry._placeholder_cache:
+            placeholder_icon = Image.new("RGBA", (icon_size, icon_size), "blue")
+            AppEntry._placeholder_cache[icon_size] = ImageTk.PhotoImage(placeholder_icon)
+        self.photo = AppEntry._placeholder_cache[icon_size]
         self.icon_label = tk.Label(self, image=self.photo, bg=self.default_bg)
         self.icon_label.grid(row=0, column=0, padx=int(10*scale_factor), pady=int(5*scale_factor), sticky="nsew")
 
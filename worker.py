@@ -1,133 +1,491 @@
 import asyncio
+import io
+import os
+import pickle
 import time
-import gc
 import psutil
 import ctypes
+import win32api
+import win32con
 import win32gui
 import win32ui
 from PIL import Image
 import threading
-from cachetools import LRUCache
+from collections import OrderedDict
+import weakref
+from concurrent.futures import ThreadPoolExecutor
 import comtypes
 
 from logger import logger
-from audio_monitor import AudioMonitor
+from audio_monitor import AudioMonitor, save_executable_details_cache
 from media_controller import MediaController
 from config import config_manager
 
-# 使用 LRUCache 替换 dict，并增加线程锁保证安全
-icon_cache = LRUCache(maxsize=128)
+# 按键哈希分片的 LRU 图标缓存，每个分片有独立的锁，不同 exe 的读写互不阻塞
+# 键为 exe 的 (大小, 修改时间) 指纹；无法获取指纹时退回 exe 路径
+ICON_CACHE_SHARDS = 8  # 必须是 2 的幂
+ICON_CACHE_SHARD_SIZE = 16
+_icon_shards = [(OrderedDict(), threading.Lock()) for _ in range(ICON_CACHE_SHARDS)]
+# 保护路径->指纹表与持久化缓存
 icon_cache_lock = threading.Lock()
-
-def get_icon_for_pid(pid):
-    """根据进程ID获取应用程序图标，并使用线程安全的LRU缓存。"""
+_MISSING = object()
+# exe 路径 -> (指纹, 上次 stat 的时间)；超过 ICON_FP_RECHECK_SECONDS 后重新 stat，
+# 以发现被原地更新的 exe
+icon_fp_by_path = {}
+ICON_FP_RECHECK_SECONDS = 60
+
+# --- 持久化的图标缓存 ---
+# 指纹 -> PNG 字节，重启后无需再次通过 GDI 提取
+ICON_CACHE_FILE = 'icon_cache.pkl'
+ICON_CACHE_FLUSH_EVERY = 8
+ICON_CACHE_PERSIST_MAX = 256
+persistent_icons = {}
+_icon_persist_state = {'dirty': 0}
+_icon_save_lock = threading.Lock()
+
+# PID -> (进程创建时间, 可执行文件路径)。创建时间用于识别被系统复用的PID；
+# 路径为空字符串表示无权访问（如系统进程），避免反复重试
+_pid_exe_cache = {}
+_pid_exe_lock = threading.Lock()
+# 进程名 -> exe 路径 快速查找表的容量
+PROCESS_NAME_CACHE_SIZE = 256
+# 每隔多少次轮询清理一次已退出进程的记录
+PID_EXE_PRUNE_POLLS = 60
+
+def prime_pid_exe_cache():
+    """一次遍历所有进程，预先填充 PID -> exe 缓存。"""
+    entries = {}
+    for proc in psutil.process_iter(attrs=['pid', 'create_time', 'exe']):
+        create_time = proc.info.get('create_time')
+        if create_time is not None:
+            entries[proc.info['pid']] = (create_time, proc.info.get('exe') or '')
+    with _pid_exe_lock:
+        _pid_exe_cache.update(entries)
+    logger.log_debug("[图标缓存] 已预加载 %d 个进程的可执行文件路径", len(entries))
+
+def prune_pid_exe_cache():
+    """移除已退出进程的记录。"""
+    live_pids = set(psutil.pids())
+    with _pid_exe_lock:
+        stale = [pid for pid in _pid_exe_cache if pid not in live_pids]
+        for pid in stale:
+            del _pid_exe_cache[pid]
+    if stale:
+        logger.log_debug("[图标缓存] 已清理 %d 个已退出进程的路径记录", len(stale))
+
+def resolve_exe_path(pid):
+    """返回进程的可执行文件路径；进程已退出或无权访问时返回 None。"""
     try:
         proc = psutil.Process(pid)
-        exe_path = proc.exe()
+        create_time = proc.create_time()
     except (psutil.NoSuchProcess, psutil.AccessDenied):
+        with _pid_exe_lock:
+            _pid_exe_cache.pop(pid, None)
         return None
 
-    if not exe_path:
-        return None
+    with _pid_exe_lock:
+        cached = _pid_exe_cache.get(pid)
+    # 创建时间不同说明PID已被新进程复用，旧记录作废
+    if cached is not None and cached[0] == create_time:
+        return cached[1] or None
 
+    try:
+        exe_path = proc.exe()
+    except psutil.NoSuchProcess:
+        with _pid_exe_lock:
+            _pid_exe_cache.pop(pid, None)
+        return None
+    except psutil.AccessDenied:
+        exe_path = ''
+    with _pid_exe_lock:
+        _pid_exe_cache[pid] = (create_time, exe_path)
+    return exe_path or None
+
+class _BITMAPINFOHEADER(ctypes.Structure):
+    _fields_ = [
+        ('biSize', ctypes.c_uint32),
+        ('biWidth', ctypes.c_int32),
+        ('biHeight', ctypes.c_int32),
+        ('biPlanes', ctypes.c_uint16),
+        ('biBitCount', ctypes.c_uint16),
+        ('biCompression', ctypes.c_uint32),
+        ('biSizeImage', ctypes.c_uint32),
+        ('biXPelsPerMeter', ctypes.c_int32),
+        ('biYPelsPerMeter', ctypes.c_int32),
+        ('biClrUsed', ctypes.c_uint32),
+        ('biClrImportant', ctypes.c_uint32),
+    ]
+
+_BI_RGB = 0
+_DIB_RGB_COLORS = 0
+_GetDIBits = ctypes.windll.gdi32.GetDIBits
+_GetDIBits.argtypes = [ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint, ctypes.c_uint,
+                       ctypes.c_void_p, ctypes.c_void_p, ctypes.c_uint]
+_GetDIBits.restype = ctypes.c_int
+
+class _SHFILEINFOW(ctypes.Structure):
+    _fields_ = [
+        ('hIcon', ctypes.c_void_p),
+        ('iIcon', ctypes.c_int),
+        ('dwAttributes', ctypes.c_uint32),
+        ('szDisplayName', ctypes.c_wchar * 260),
+        ('szTypeName', ctypes.c_wchar * 80),
+    ]
+
+_SHGFI_ICON = 0x000000100
+_SHGFI_LARGEICON = 0x000000000
+_SHGetFileInfoW = ctypes.windll.shell32.SHGetFileInfoW
+_SHGetFileInfoW.argtypes = [ctypes.c_wchar_p, ctypes.c_uint32, ctypes.POINTER(_SHFILEINFOW),
+                            ctypes.c_uint, ctypes.c_uint]
+_SHGetFileInfoW.restype = ctypes.c_size_t
+
+# 每个提取线程各自持有按尺寸复用的像素缓冲区，避免每次提取都分配新的 bytes
+_gdi_local = threading.local()
+
+# 所有线程创建过的 (显示器DC, 内存DC)，在图标线程池关闭后统一释放
+_thread_dcs = []
+_thread_dcs_lock = threading.Lock()
+
+def _get_thread_dcs():
+    """返回当前线程复用的显示器DC及其兼容内存DC，首次调用时创建。"""
+    dcs = getattr(_gdi_local, 'dcs', None)
+    if dcs is None:
+        # CreateDC 创建的DC不像 GetDC(0) 那样要求在同一线程中释放
+        hdc = win32ui.CreateDCFromHandle(win32gui.CreateDC('DISPLAY', None, None))
+        dcs = _gdi_local.dcs = (hdc, hdc.CreateCompatibleDC())
+        with _thread_dcs_lock:
+            _thread_dcs.append(dcs)
+    return dcs
+
+def release_thread_dcs():
+    """释放所有线程缓存的DC。只能在不再有图标提取任务运行时调用。"""
+    with _thread_dcs_lock:
+        dcs_list = _thread_dcs[:]
+        _thread_dcs.clear()
+    for hdc, mem_dc in dcs_list:
+        try:
+            mem_dc.DeleteDC()
+            hdc.DeleteDC()
+        except Exception as e:
+            logger.log_warning(f"[图标缓存] 释放DC失败: {e}")
+
+def _read_bitmap_bgra(hdc, hbitmap, width, height):
+    """用 GetDIBits 将位图按自上而下的 32 位 BGRA 读入线程内复用的缓冲区。
+    返回的缓冲区在本线程下一次提取前有效。"""
+    scratch = getattr(_gdi_local, 'bmp_scratch', None)
+    if scratch is None:
+        scratch = _gdi_local.bmp_scratch = {}
+    buf = scratch.get((width, height))
+    if buf is None:
+        buf = scratch[(width, height)] = bytearray(width * height * 4)
+
+    header = _BITMAPINFOHEADER()
+    header.biSize = ctypes.sizeof(_BITMAPINFOHEADER)
+    header.biWidth = width
+    header.biHeight = -height  # 负值表示自上而下的行序
+    header.biPlanes = 1
+    header.biBitCount = 32
+    header.biCompression = _BI_RGB
+
+    c_buf = (ctypes.c_char * len(buf)).from_buffer(buf)
+    lines = _GetDIBits(hdc, hbitmap, 0, height, c_buf, ctypes.byref(header), _DIB_RGB_COLORS)
+    if lines != height:
+        raise OSError(f"GetDIBits 仅读取了 {lines}/{height} 行")
+    return buf
+
+def icon_fingerprint(exe_path):
+    """返回 exe 的 (大小, 修改时间) 指纹；同一路径在 ICON_FP_RECHECK_SECONDS 内只 stat 一次。
+    文件不可访问时返回 None。"""
+    now = time.monotonic()
     with icon_cache_lock:
-        if exe_path in icon_cache:
-            logger.log_debug(f"[图标缓存] 命中: {exe_path}")
-            return icon_cache[exe_path]
-        logger.log_debug(f"[图标缓存] 未命中，尝试提取: {exe_path}")
-
-    large, small = [], []
-    hicon = None
+        entry = icon_fp_by_path.get(exe_path)
+    if entry is not None and now - entry[1] < ICON_FP_RECHECK_SECONDS:
+        return entry[0]
     try:
-        # 1. 获取文件中图标的总数 (2-arg call)
-        num_icons = win32gui.ExtractIconEx(exe_path, -1)
-        if num_icons == 0:
+        st = os.stat(exe_path)
+    except OSError:
+        with icon_cache_lock:
+            icon_fp_by_path.pop(exe_path, None)
+        return None
+    fingerprint = (st.st_size, st.st_mtime_ns)
+    with icon_cache_lock:
+        icon_fp_by_path[exe_path] = (fingerprint, now)
+    return fingerprint
+
+def _icon_shard(key):
+    return _icon_shards[hash(key) & (ICON_CACHE_SHARDS - 1)]
+
+def _icon_cache_get(key):
+    """读取图标缓存并标记为最近使用；未命中返回 _MISSING。"""
+    shard, lock = _icon_shard(key)
+    with lock:
+        icon = shard.get(key, _MISSING)
+        if icon is not _MISSING:
+            shard.move_to_end(key)
+    return icon
+
+def _icon_cache_put(key, icon):
+    """写入图标缓存，分片超出容量时淘汰其中最久未使用的条目。"""
+    shard, lock = _icon_shard(key)
+    with lock:
+        shard[key] = icon
+        shard.move_to_end(key)
+        if len(shard) > ICON_CACHE_SHARD_SIZE:
+            shard.popitem(last=False)
+
+def get_cached_icon(exe_path):
+    """查询图标缓存。返回 (是否命中, 图标)，图标可能为缓存的 None。"""
+    with icon_cache_lock:
+        entry = icon_fp_by_path.get(exe_path)
+    if entry is None:
+        key = exe_path
+    elif time.monotonic() - entry[1] < ICON_FP_RECHECK_SECONDS:
+        key = entry[0]
+    else:
+        # 指纹需要重新确认：按未命中处理，交给线程池中的 extract_icon_blocking 重新 stat
+        return False, None
+    icon = _icon_cache_get(key)
+    if icon is _MISSING:
+        return False, None
+    logger.log_debug("[图标缓存] 命中: %s", exe_path)
+    return True, icon
+
+def load_icon_cache(cache_path=ICON_CACHE_FILE):
+    """从磁盘加载上次运行时保存的图标（PNG 字节），解码推迟到首次使用时。"""
+    if not os.path.exists(cache_path):
+        return
+    try:
+        with open(cache_path, 'rb') as f:
+            data = pickle.load(f)
+        if isinstance(data, dict):
             with icon_cache_lock:
-                icon_cache[exe_path] = None
-            return None
+                persistent_icons.update(data)
+            logger.log_debug("[图标缓存] 已从 '%s' 加载 %d 个图标", cache_path, len(data))
+    except Exception as e:
+        logger.log_warning(f"[图标缓存] 加载持久化缓存失败: {e}")
+
+def save_icon_cache(cache_path=ICON_CACHE_FILE):
+    """将持久化图标写回磁盘，只保留最近使用的 ICON_CACHE_PERSIST_MAX 个。"""
+    # 多个提取线程可能同时触发写盘，串行化以免共用同一个临时文件
+    with _icon_save_lock:
+        with icon_cache_lock:
+            dirty = _icon_persist_state['dirty']
+            if not dirty:
+                return
+            items = list(persistent_icons.items())[-ICON_CACHE_PERSIST_MAX:]
+        try:
+            tmp_path = cache_path + '.tmp'
+            with open(tmp_path, 'wb') as f:
+                pickle.dump(dict(items), f, protocol=pickle.HIGHEST_PROTOCOL)
+            os.replace(tmp_path, cache_path)
+        except Exception as e:
+            # 保留脏计数，下次写盘时重试
+            logger.log_warning(f"[图标缓存] 保存持久化缓存失败: {e}")
+            return
+        with icon_cache_lock:
+            # 写盘期间新加入的条目仍计为未保存
+            _icon_persist_state['dirty'] -= dirty
+        logger.log_debug("[图标缓存] 已保存 %d 个图标到 '%s'", len(items), cache_path)
 
-        # 2. 提取第一个大图标和第一个小图标 (3-arg call)
-        large, small = win32gui.ExtractIconEx(exe_path, 0, 1)
+def _load_persisted_icon(fingerprint):
+    """从持久化缓存中解码图标；不存在或已损坏时返回 None。"""
+    with icon_cache_lock:
+        png_bytes = persistent_icons.pop(fingerprint, None)
+        if png_bytes is not None:
+            # 重新插入到末尾，保存时按最近使用保留
+            persistent_icons[fingerprint] = png_bytes
+    if png_bytes is None:
+        return None
+    try:
+        with Image.open(io.BytesIO(png_bytes)) as png:
+            # convert 会读出像素并返回独立的 RGBA 图像，缓存的图像不再引用 PNG 文件对象
+            return png.convert('RGBA')
+    except Exception as e:
+        logger.log_warning(f"[图标缓存] 持久化图标解码失败: {e}")
+        return None
 
-        hicon = large[0] if large else (small[0] if small else None)
+def _persist_icon(fingerprint, img):
+    """把新提取的图标编码为 PNG 加入持久化缓存，累计足够多的新条目后写盘。"""
+    buf = io.BytesIO()
+    img.save(buf, 'PNG')
+    with icon_cache_lock:
+        persistent_icons[fingerprint] = buf.getvalue()
+        _icon_persist_state['dirty'] += 1
+        should_flush = _icon_persist_state['dirty'] >= ICON_CACHE_FLUSH_EVERY
+    if should_flush:
+        save_icon_cache()
+
+def extract_icon_blocking(exe_path):
+    """
+    获取 exe 的图标并写入缓存。依次查询：按指纹的内存缓存、磁盘持久化缓存、GDI 提取。
+    耗时较长，应在线程池中调用。
+    """
+    fingerprint = icon_fingerprint(exe_path)
+    key = fingerprint or exe_path
+    # 内容相同的 exe（如重新安装到不同路径）共用同一个图标
+    icon = _icon_cache_get(key)
+    if icon is not _MISSING:
+        return icon
+
+    img = _load_persisted_icon(fingerprint) if fingerprint else None
+    if img is not None:
+        logger.log_debug("[图标缓存] 持久化缓存命中: %s", exe_path)
+    else:
+        img = _extract_icon_gdi(exe_path)
+        if img is not None and fingerprint:
+            _persist_icon(fingerprint, img)
+
+    _icon_cache_put(key, img)
+    if img is None:
+        logger.log_warning(f"[图标缓存] 提取失败，缓存None: {exe_path}")
+    else:
+        logger.log_debug("[图标缓存] 成功提取并缓存图标: %s", exe_path)
+    return img
+
+def _extract_icon_gdi(exe_path):
+    """通过 SHGetFileInfo 获取 exe 的系统大图标，并用 GDI 绘制为 RGBA 图像。"""
+    logger.log_debug("[图标缓存] 未命中，尝试提取: %s", exe_path)
+    sfi = _SHFILEINFOW()
+    try:
+        # 一次调用即可得到系统图标尺寸的图标句柄，无需先统计再提取
+        if not _SHGetFileInfoW(exe_path, 0, ctypes.byref(sfi), ctypes.sizeof(sfi), _SHGFI_ICON | _SHGFI_LARGEICON):
+            return None
+        hicon = sfi.hIcon
         if not hicon:
-            with icon_cache_lock:
-                icon_cache[exe_path] = None
             return None
 
-        icon_info = win32gui.GetIconInfo(hicon)
-        hbmColor = icon_info[3]
-        hbmMask = icon_info[4]
-
+        width = win32api.GetSystemMetrics(win32con.SM_CXICON)
+        height = win32api.GetSystemMetrics(win32con.SM_CYICON)
+        hdc, mem_dc = _get_thread_dcs()
+        save_bit_map = win32ui.CreateBitmap()
         try:
-            bmp_info = win32gui.GetObject(hbmColor)
-            width, height = bmp_info.bmWidth, bmp_info.bmHeight
-
-            hdc = win32ui.CreateDCFromHandle(win32gui.GetDC(0))
-            mem_dc = hdc.CreateCompatibleDC()
-            save_bit_map = win32ui.CreateBitmap()
-            
-            try:
-                save_bit_map.CreateCompatibleBitmap(hdc, width, height)
-                mem_dc.SelectObject(save_bit_map)
-                mem_dc.DrawIcon((0, 0), hicon)
-                
-                bmp_str = save_bit_map.GetBitmapBits(True)
-                img = Image.frombuffer('RGBA', (width, height), bmp_str, 'raw', 'BGRA', 0, 1)
-                
-                with icon_cache_lock:
-                    icon_cache[exe_path] = img
-                    logger.log_debug(f"[图标缓存] 成功提取并缓存图标: {exe_path}")
-                return img
-
-            finally:
-                if save_bit_map.GetHandle():
-                    win32gui.DeleteObject(save_bit_map.GetHandle())
-                mem_dc.DeleteDC()
-                hdc.DeleteDC()
-
+            save_bit_map.CreateCompatibleBitmap(hdc, width, height)
+            old_bitmap = mem_dc.SelectObject(save_bit_map)
+            win32gui.DrawIconEx(mem_dc.GetSafeHdc(), 0, 0, hicon, width, height, 0, None, win32con.DI_NORMAL)
+            # GetDIBits 要求位图未被选入任何 DC
+            mem_dc.SelectObject(old_bitmap)
+
+            buf = _read_bitmap_bgra(hdc.GetSafeHdc(), save_bit_map.GetHandle(), width, height)
+            # frombytes 会立即解码并复制像素，缓冲区随后可被下一次提取复用
+            img = Image.frombytes('RGBA', (width, height), memoryview(buf), 'raw', 'BGRA', 0, 1)
+            return img
         finally:
-            if hbmColor: win32gui.DeleteObject(hbmColor)
-            if hbmMask: win32gui.DeleteObject(hbmMask)
+            if save_bit_map.GetHandle():
+                win32gui.DeleteObject(save_bit_map.GetHandle())
 
     except Exception as e:
         logger.log_error(f"无法为 {exe_path} 提取图标: {e}")
-        with icon_cache_lock:
-            icon_cache[exe_path] = None
-            logger.log_warning(f"[图标缓存] 提取失败，缓存None: {exe_path}")
         return None
     finally:
-        # 3. 确保销毁所有从 ExtractIconEx 获取的句柄
-        for ico in large:
-            if ico: win32gui.DestroyIcon(ico)
-        for ico in small:
-            if ico: win32gui.DestroyIcon(ico)
+        if sfi.hIcon:
+            win32gui.DestroyIcon(sfi.hIcon)
+
+# 主窗口列表与属性窗口会显示的会话字段（图标另按对象标识比较）
+UI_SESSION_FIELDS = ('source', 'sid', 'pid', 'display_name', 'process_name',
+                     'title', 'artist', 'status', 'peak_value')
+
+def _init_mta_com():
+    """音频线程初始化：以多线程单元 (MTA) 初始化 COM。"""
+    comtypes.CoInitializeEx(comtypes.COINIT_MULTITHREADED)
+
+def make_source_id(source):
+    """为媒体会话的 source 生成进程内稳定的整数ID，供UI作为字典键使用。
+    保留完整的哈希值：截断为 32 位会让不同会话更容易冲突，导致UI中的条目被合并或覆盖。"""
+    return hash(source)
+
+class WorkerQueue:
+    """
+    发往后台工作线程的消息队列。任意线程都可以 put；
+    工作线程的事件循环绑定后通过 await get() 等待消息，无需轮询。
+    """
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._loop = None
+        self._queue = None
+        # 事件循环绑定之前收到的消息
+        self._pending = []
+
+    def put(self, message):
+        with self._lock:
+            loop = self._loop
+            if loop is None:
+                self._pending.append(message)
+                return
+            async_queue = self._queue
+        try:
+            loop.call_soon_threadsafe(async_queue.put_nowait, message)
+        except RuntimeError:
+            # 事件循环已关闭，后台工作线程正在退出
+            pass
+
+    def bind(self, loop):
+        """在事件循环线程中调用，之后的消息直接投递到该循环。"""
+        async_queue = asyncio.Queue()
+        with self._lock:
+            self._loop = loop
+            self._queue = async_queue
+            pending, self._pending = self._pending, []
+        for message in pending:
+            async_queue.put_nowait(message)
+
+    def unbind(self):
+        with self._lock:
+            self._loop = None
+            self._queue = None
+
+    async def get(self):
+        return await self._queue.get()
 
 class BackgroundWorker:
+    # 关闭时每个阶段等待任务响应取消的最长时间（秒）；关闭共有两个这样的阶段
+    SHUTDOWN_TIMEOUT = 3.0
+
     def __init__(self, ui_queue, worker_queue):
         self.ui_queue = ui_queue
         self.worker_queue = worker_queue
         self.stop_event = threading.Event()
         self.last_known_state = None
+        self.last_known_state_fp = None
+        self._last_audio_fp = None
+        # 媒体会话 source -> (补全依据, 补全后的会话字典)
+        self._enriched_by_source = {}
         
         self.target_app_info = None
         self.was_paused_by_app = False
         self.was_manually_paused = False # 新增：跟踪手动暂停状态
         # self.active_com_sessions 已被移除，以防止COM对象泄漏
+        # 以下两个快照发布后不再修改：写入方构建新对象后整体替换引用，读取方无需加锁
         self.latest_audio_apps_with_icons = []
         self.all_known_apps_cache = {}
-        self.delay_timers = {} # 新增：用于跟踪延时模式的应用
-        self.lock = threading.Lock()
+        self.delay_timers = {} # 新增：延时模式应用名 -> 到期时间 (time.monotonic)
+        # 每次轮询都会用到的配置项，仅在收到 config_updated 时刷新
+        self._refresh_config_snapshot()
 
         # 为事件驱动模型新增的属性
         self.loop = None
         self.async_stop_event = None
+        self.audio_changed_event = None
         self.media_controller = None
 
         self.audio_monitor = None
-
-    def __del__(self):
-        print("[GC] BackgroundWorker has been garbage collected.")
+        # 图标提取涉及多次阻塞的 GDI 调用，放到专用线程池中执行，避免阻塞事件循环
+        # SHGetFileInfo 要求调用线程已初始化 COM
+        self._icon_pool = ThreadPoolExecutor(max_workers=3, thread_name_prefix='IconExtract_',
+                                             initializer=comtypes.CoInitialize)
+        # 音频会话轮询是阻塞的 COM 调用，放到单独的 MTA 线程中执行，避免阻塞事件循环；
+        # 在 MTA 中注册的会话通知也能由音频服务直接回调
+        self._audio_pool = ThreadPoolExecutor(max_workers=1, thread_name_prefix='AudioPoll_',
+                                              initializer=_init_mta_com)
+        # exe_path -> 正在进行的提取任务；只在事件循环线程中访问，无需加锁
+        self._icon_inflight = {}
+        self._polls_since_prune = 0
+        # 进程名 -> 已成功取得图标的 exe 路径（LRU）；同名进程的新 PID（如浏览器子进程）无需再解析路径
+        self._exe_by_process_name = OrderedDict()
+        # 使用 finalize 代替 __del__，不会妨碍循环垃圾回收
+        weakref.finalize(self, logger.log_debug, "[GC] BackgroundWorker has been garbage collected.")
+
+    def _refresh_config_snapshot(self):
+        self._cfg_ignore_manual_pause = config_manager.get('general.ignore_manual_pause', False)
 
     def stop(self):
         logger.log_info("[后台工作线程] 收到停止请求")
@@ -136,53 +494,107 @@ class BackgroundWorker:
             self.loop.call_soon_threadsafe(self.async_stop_event.set)
 
     def get_latest_audio_apps_with_icons(self):
-        """线程安全地获取最新的、包含图标的音频应用列表。"""
-        with self.lock:
-            return self.latest_audio_apps_with_icons
+        """获取最新的、包含图标的音频应用列表快照。调用方不应修改返回值。"""
+        return self.latest_audio_apps_with_icons
 
     def get_all_known_apps(self):
-        """线程安全地获取所有已知应用的缓存。"""
-        with self.lock:
-            return self.all_known_apps_cache.copy()
+        """获取所有已知应用的缓存快照。调用方不应修改返回值。"""
+        return self.all_known_apps_cache
 
-    async def _handle_worker_queue(self):
+    async def _worker_queue_loop(self):
+        """持续等待并处理来自UI线程的消息。"""
+        while True:
+            message = await self.worker_queue.get()
+            try:
+                await self._handle_worker_message(message)
+            except Exception as e:
+                logger.log_error(f"[后台工作线程] 处理消息时出错: {e}")
+
+    async def _handle_worker_message(self, message):
+        msg_type = message.get('type')
+        data = message.get('data')
+        if msg_type == 'state_update':
+            self.target_app_info = data.get('target')
+            self.was_paused_by_app = data.get('paused', False)
+            # 当目标应用改变或取消时，重置手动暂停标志
+            if not self.target_app_info or (self.last_known_state and self.target_app_info['source'] not in self.last_known_state):
+                self.was_manually_paused = False
+            logger.log_debug("[后台工作线程] 收到状态更新: 目标=%s",
+                             self.target_app_info.get('display_name') if self.target_app_info else '无')
+        elif msg_type == 'force_refresh':
+            self.last_known_state = None
+            self._last_audio_fp = None
+            logger.log_info("[后台工作线程] 收到强制刷新请求")
+            # 立即开始下一次轮询，而不是等到下一个周期
+            self.audio_changed_event.set()
+        elif msg_type == 'ui_destroyed':
+            self.last_known_state = None
+            self._last_audio_fp = None
+            logger.log_info("[后台工作线程] 收到UI销毁通知，清除状态缓存")
+        elif msg_type == 'config_updated':
+            config_manager.reload_config()
+            self._refresh_config_snapshot()
+            logger.log_info("[后台工作线程] 配置已重新加载")
+        elif msg_type == 'control_app':
+            source = data.get('source')
+            status = data.get('status')
+            is_target_app = self.target_app_info and source == self.target_app_info['source']
+
+            # 如果是目标应用被手动暂停，则设置标志
+            if is_target_app and status == 'Playing':
+                self.was_manually_paused = True
+                logger.log_info(f"检测到目标应用被手动暂停: {self.target_app_info.get('display_name')}")
+
+            await self.media_controller.control_media(source, 'pause' if status == 'Playing' else 'play')
+            # 请求强制刷新以立即更新UI
+            self.last_known_state = None
+            self.audio_changed_event.set()
+
+
+    async def get_icon_for_pid_async(self, pid, process_name=None):
+        """
+        异步获取进程图标。路径解析与图标提取都在线程池中进行；
+        同一 exe 的并发请求共享同一个提取任务。
+        提供 process_name 时，同名进程已取得过的图标会被直接复用。
+        """
+        if process_name:
+            exe_path = self._exe_by_process_name.get(process_name)
+            if exe_path is not None:
+                # 只记录路径，图标仍从有界的图标缓存中取，exe 更新后随缓存一起失效
+                hit, icon = get_cached_icon(exe_path)
+                if hit and icon is not None:
+                    self._exe_by_process_name.move_to_end(process_name)
+                    return icon
+
+        exe_path, icon = await self._fetch_icon_for_pid(pid)
+        if icon is not None and process_name:
+            self._exe_by_process_name[process_name] = exe_path
+            self._exe_by_process_name.move_to_end(process_name)
+            if len(self._exe_by_process_name) > PROCESS_NAME_CACHE_SIZE:
+                self._exe_by_process_name.popitem(last=False)
+        return icon
+
+    async def _fetch_icon_for_pid(self, pid):
+        """返回 (exe 路径, 图标)；无法解析路径时返回 (None, None)。"""
+        loop = asyncio.get_running_loop()
+        exe_path = await loop.run_in_executor(self._icon_pool, resolve_exe_path, pid)
+        if not exe_path:
+            return None, None
+
+        hit, icon = get_cached_icon(exe_path)
+        if hit:
+            return exe_path, icon
+
+        pending = self._icon_inflight.get(exe_path)
+        if pending is not None:
+            return exe_path, await pending
+
+        future = loop.run_in_executor(self._icon_pool, extract_icon_blocking, exe_path)
+        self._icon_inflight[exe_path] = future
         try:
-            while True:
-                message = self.worker_queue.get_nowait()
-                msg_type = message.get('type')
-                data = message.get('data')
-                if msg_type == 'state_update':
-                    self.target_app_info = data.get('target')
-                    self.was_paused_by_app = data.get('paused', False)
-                    # 当目标应用改变或取消时，重置手动暂停标志
-                    if not self.target_app_info or (self.last_known_state and self.target_app_info['source'] not in self.last_known_state):
-                        self.was_manually_paused = False
-                    logger.log_debug(f"[后台工作线程] 收到状态更新: 目标={self.target_app_info.get('display_name') if self.target_app_info else '无'}")
-                elif msg_type == 'force_refresh':
-                    self.last_known_state = None
-                    logger.log_info("[后台工作线程] 收到强制刷新请求")
-                elif msg_type == 'ui_destroyed':
-                    self.last_known_state = None
-                    logger.log_info("[后台工作线程] 收到UI销毁通知，清除状态缓存")
-                elif msg_type == 'config_updated':
-                    config_manager.reload_config()
-                    logger.log_info("[后台工作线程] 配置已重新加载")
-                elif msg_type == 'control_app':
-                    source = data.get('source')
-                    status = data.get('status')
-                    is_target_app = self.target_app_info and source == self.target_app_info['source']
-
-                    # 如果是目标应用被手动暂停，则设置标志
-                    if is_target_app and status == 'Playing':
-                        self.was_manually_paused = True
-                        logger.log_info(f"检测到目标应用被手动暂停: {self.target_app_info.get('display_name')}")
-
-                    await self.media_controller.control_media(source, 'pause' if status == 'Playing' else 'play')
-                    # 请求强制刷新以立即更新UI
-                    self.last_known_state = None
-        except Exception: # queue.Empty
-            pass
-
+            return exe_path, await future
+        finally:
+            self._icon_inflight.pop(exe_path, None)
 
     async def _check_audio_and_control_target(self, audio_apps):
         """根据音频状态控制目标应用，实现新的白名单逻辑。"""
@@ -190,49 +602,54 @@ class BackgroundWorker:
             return
 
         target_pid = self.target_app_info.get('pid')
-        whitelist = config_manager.get('audio.whitelist', {})
+        whitelist_lookup = config_manager.whitelist_lookup
         
-        # --- 清理不再播放的延时计时器 ---
-        playing_app_names = {app['process_name'] for app in audio_apps if app.get('is_playing')}
-        for app_name in list(self.delay_timers.keys()):
-            if app_name not in playing_app_names:
-                del self.delay_timers[app_name]
-                logger.log_debug(f"[后台工作线程] 应用 '{app_name}' 已停止播放，从延时计时器中移除。")
-
-        # --- 检查是否有干扰应用 ---
+        # --- 单次遍历：收集正在播放的应用名，同时检查是否有干扰应用 ---
+        playing_app_names = set()
         is_interfering = False
         for app in audio_apps:
-            if not app.get('is_playing') or app.get('pid') == target_pid:
+            if not app.get('is_playing'):
                 continue
 
             app_name = app.get('process_name')
             if not app_name:
                 continue
+            playing_app_names.add(app_name)
+
+            # 已发现干扰后只需继续收集应用名，供下面清理计时器使用
+            if is_interfering or app.get('pid') == target_pid:
+                continue
 
-            settings = whitelist.get(app_name)
-            mode = settings.get('mode') if settings else 'normal'
+            entry = whitelist_lookup(app_name)
+            mode, delay_seconds = entry if entry else ('normal', 0)
 
             if mode == '忽略':
-                logger.log_debug(f"[后台工作线程] 应用 '{app_name}' 在白名单中（模式：忽略），已跳过。")
+                logger.log_debug("[后台工作线程] 应用 '%s' 在白名单中（模式：忽略），已跳过。", app_name)
                 continue
             
             if mode == '延时':
-                delay_seconds = settings.get('delay_seconds', 2)
-                if app_name not in self.delay_timers:
-                    self.delay_timers[app_name] = time.time()
-                    logger.log_debug(f"[后台工作线程] 应用 '{app_name}' 开始播放（模式：延时），启动 {delay_seconds} 秒计时器。")
+                now = time.monotonic()
+                expires_at = self.delay_timers.get(app_name)
+                if expires_at is None:
+                    self.delay_timers[app_name] = now + delay_seconds
+                    logger.log_debug("[后台工作线程] 应用 '%s' 开始播放（模式：延时），启动 %s 秒计时器。", app_name, delay_seconds)
                     continue # 刚开始，不视为干扰
                 
-                if time.time() - self.delay_timers[app_name] < delay_seconds:
-                    logger.log_debug(f"[后台工作线程] 应用 '{app_name}' 仍在延时期间，暂不处理。")
+                if now < expires_at:
+                    logger.log_debug("[后台工作线程] 应用 '%s' 仍在延时期间，暂不处理。", app_name)
                     continue # 仍在延时期间，不视为干扰
                 
                 logger.log_info(f"[后台工作线程] 应用 '{app_name}' 播放超过延时，视为干扰。")
 
-            # 对于 'normal' 模式或延时超时的应用
+            # 对于 'normal' 模式或延时超时的应用；发现一个干扰就足够了
             is_interfering = True
             logger.log_info(f"[后台工作线程] 检测到干扰应用: {app_name} (模式: {mode})")
-            break # 发现一个干扰就足够了
+
+        # --- 清理不再播放的延时计时器 ---
+        if self.delay_timers:
+            for app_name in self.delay_timers.keys() - playing_app_names:
+                del self.delay_timers[app_name]
+                logger.log_debug("[后台工作线程] 应用 '%s' 已停止播放，从延时计时器中移除。", app_name)
 
         # --- 根据干扰状态控制目标应用 ---
         target_source = self.target_app_info['source']
@@ -251,10 +668,8 @@ class BackgroundWorker:
                 self.ui_queue.put({'type': 'set_paused_flag', 'data': True})
         else:
             if self.was_paused_by_app:
-                ignore_manual_pause = config_manager.get('general.ignore_manual_pause', False)
-                
                 # 如果开启了“手动暂停后不恢复”并且检测到了手动暂停，则不恢复
-                if ignore_manual_pause and self.was_manually_paused:
+                if self._cfg_ignore_manual_pause and self.was_manually_paused:
                     logger.log_info(f"检测到手动暂停标志，根据设置不恢复播放: {self.target_app_info.get('display_name')}")
                     # 我们仍然需要重置 was_paused_by_app，否则下一次干扰也不会暂停它
                     self.ui_queue.put({'type': 'set_paused_flag', 'data': False})
@@ -269,26 +684,55 @@ class BackgroundWorker:
         try:
             media_sessions = await self.media_controller.get_media_sessions()
             
-            with self.lock:
-                audio_apps = self.latest_audio_apps_with_icons
-            
+            audio_apps = self.latest_audio_apps_with_icons
+
             audio_app_details_by_pid = {app['pid']: app for app in audio_apps}
+            pid_map = {app['process_name'].lower().removesuffix('.exe'): app['pid'] for app in audio_apps}
             enriched_sessions = []
+            enriched_by_source = {}
             for session_info in media_sessions:
-                display_name_lower = session_info['display_name'].lower()
-                pid_map = {app['process_name'].lower().replace('.exe', ''): app['pid'] for app in audio_apps}
-                pid = pid_map.get(display_name_lower)
-                
-                session_info['pid'] = pid
-                session_info['icon'] = get_icon_for_pid(pid) if pid else None
-                
-                if pid and pid in audio_app_details_by_pid:
-                    audio_details = audio_app_details_by_pid[pid]
-                    session_info['process_name'] = audio_details.get('process_name')
-                    session_info['peak_value'] = audio_details.get('peak_value')
-                    session_info['display_name'] = audio_details.get('display_name', session_info['display_name'])
-
+                source = session_info['source']
+                pid = pid_map.get(session_info['display_name'].lower())
+                audio_details = audio_app_details_by_pid.get(pid) if pid else None
+
+                # 会话与对应音频应用的信息都未变化时，直接复用上次补全好的字典
+                enrich_key = (
+                    session_info['display_name'], session_info.get('title'), session_info.get('artist'),
+                    session_info.get('status'), pid,
+                    (audio_details.get('process_name'), audio_details.get('peak_value'), audio_details.get('display_name'))
+                    if audio_details else None,
+                )
+                cached = self._enriched_by_source.get(source)
+                if cached and cached[0] == enrich_key:
+                    session_info = cached[1]
+                else:
+                    session_info['sid'] = make_source_id(source)
+                    session_info['pid'] = pid
+                    if cached and cached[1].get('pid') == pid and cached[1].get('icon') is not None:
+                        # PID 未变，图标也不会变；上次未取得图标时则重新尝试
+                        session_info['icon'] = cached[1]['icon']
+                    else:
+                        session_info['icon'] = await self.get_icon_for_pid_async(
+                            pid, audio_details.get('process_name') if audio_details else None) if pid else None
+                    
+                    if audio_details:
+                        session_info['process_name'] = audio_details.get('process_name')
+                        session_info['peak_value'] = audio_details.get('peak_value')
+                        session_info['display_name'] = audio_details.get('display_name', session_info['display_name'])
+
+                enriched_by_source[source] = (enrich_key, session_info)
                 enriched_sessions.append(session_info)
+            # 已发布的字典不再修改，消失的会话随之从缓存中移除
+            self._enriched_by_source = enriched_by_source
+
+            # 用UI显示的标量字段与图标对象标识构成指纹判断状态是否变化，
+            # 避免逐字段比较嵌套字典以及按像素比较图标
+            state_fp = tuple(sorted(
+                tuple(s.get(field) for field in UI_SESSION_FIELDS) + (id(s.get('icon')),)
+                for s in enriched_sessions
+            ))
+            if self.last_known_state is not None and state_fp == self.last_known_state_fp:
+                return
 
             current_state_for_ui = {s['source']: s for s in enriched_sessions}
 
@@ -303,9 +747,9 @@ class BackgroundWorker:
                     self.was_manually_paused = True
                     logger.log_info(f"检测到目标应用被外部暂停（可能为手动操作）: {self.target_app_info.get('display_name')}")
 
-            if current_state_for_ui != self.last_known_state:
-                self.ui_queue.put({'type': 'update_list', 'data': enriched_sessions})
-                self.last_known_state = current_state_for_ui
+            self.ui_queue.put({'type': 'update_list', 'data': enriched_sessions})
+            self.last_known_state = current_state_for_ui
+            self.last_known_state_fp = state_fp
         except Exception as e:
             logger.log_error(f"[后台工作线程] 更新媒体会话列表时出错: {e}")
 
@@ -313,41 +757,58 @@ class BackgroundWorker:
         """周期性地检查所有应用的音频输出，并处理干扰逻辑。"""
         while not self.stop_event.is_set():
             try:
-                await self._handle_worker_queue()
-
                 # --- 核心改动：在主循环中也调用会话更新 ---
-                await self._update_media_sessions_list_async()
-                
-                audio_apps = self.audio_monitor.get_audio_playing_apps()
+                # 媒体会话更新（WinRT 异步调用）与音频会话轮询（音频线程）同时进行
+                media_task = asyncio.create_task(self._update_media_sessions_list_async())
+                try:
+                    audio_apps = await asyncio.get_running_loop().run_in_executor(
+                        self._audio_pool, self.audio_monitor.get_audio_playing_apps)
+                finally:
+                    await media_task
                 
                 # --- 优化图标和应用缓存逻辑 ---
-                with self.lock:
-                    for app in audio_apps:
-                        process_name = app.get('process_name')
-                        if not process_name:
-                            continue
-                        
-                        # 尝试从缓存恢复图标，因为 audio_monitor 不处理图标
-                        cached_app = self.all_known_apps_cache.get(process_name)
-                        if cached_app:
-                            app['icon'] = cached_app.get('icon')
-                        
-                        # 如果仍然没有图标（对于新应用），则获取它
-                        if not app.get('icon'):
-                            app['icon'] = get_icon_for_pid(app['pid'])
-                        
-                        # 使用最新的应用信息（包括 is_playing 状态）更新缓存
-                        self.all_known_apps_cache[process_name] = app
-
-                    # 更新带有图标的最新应用列表
-                    self.latest_audio_apps_with_icons = audio_apps
-
-                self.ui_queue.put({'type': 'update_audio_apps', 'data': audio_apps})
+                # 在新的缓存副本上补全图标，完成后整体发布，UI线程读取时不会被图标提取阻塞
+                new_cache = dict(self.all_known_apps_cache)
+                for app in audio_apps:
+                    process_name = app.get('process_name')
+                    if not process_name:
+                        continue
+                    
+                    # 尝试从缓存恢复图标，因为 audio_monitor 不处理图标
+                    cached_app = new_cache.get(process_name)
+                    if cached_app:
+                        app['icon'] = cached_app.get('icon')
+                    
+                    # 如果仍然没有图标（对于新应用），则获取它
+                    if not app.get('icon'):
+                        app['icon'] = await self.get_icon_for_pid_async(app['pid'], process_name)
+
+                    # 使用最新的应用信息（包括 is_playing 状态）更新缓存
+                    new_cache[process_name] = app
+
+                # 单次引用赋值即完成发布
+                self.all_known_apps_cache = new_cache
+                self.latest_audio_apps_with_icons = audio_apps
+
+                # 仅在应用列表或播放状态变化时通知UI；峰值取两位小数，忽略细微波动
+                audio_fp = tuple(
+                    (app['pid'], app.get('process_name'), app.get('is_playing'),
+                     app.get('icon') is not None,
+                     round(app['peak_value'], 2) if app.get('peak_value') is not None else None)
+                    for app in audio_apps
+                )
+                if audio_fp != self._last_audio_fp:
+                    self._last_audio_fp = audio_fp
+                    self.ui_queue.put({'type': 'update_audio_apps', 'data': audio_apps})
                 
                 await self._check_audio_and_control_target(audio_apps)
+
+                self._polls_since_prune += 1
+                if self._polls_since_prune >= PID_EXE_PRUNE_POLLS:
+                    self._polls_since_prune = 0
+                    self._icon_pool.submit(prune_pid_exe_cache)
                 
-                gc.collect()
-                await asyncio.sleep(1)
+                await self._wait_for_next_poll(1)
             except asyncio.CancelledError:
                 logger.log_info("[后台工作线程] 周期性检查循环被取消。")
                 break
@@ -355,19 +816,42 @@ class BackgroundWorker:
                 logger.log_error(f"[后台工作线程] 周期性检查循环中发生错误: {e}")
                 await asyncio.sleep(5)
 
+    async def _wait_for_next_poll(self, timeout):
+        """等待下一次轮询：音频会话发生变化或收到需要立即刷新的消息时提前唤醒，否则等待 timeout 秒。"""
+        try:
+            await asyncio.wait_for(self.audio_changed_event.wait(), timeout)
+            logger.log_debug("[后台工作线程] 收到唤醒通知，提前开始轮询。")
+        except asyncio.TimeoutError:
+            pass
+        self.audio_changed_event.clear()
+
+    def _notify_audio_changed(self):
+        """由音频服务线程调用，将会话变化转交给事件循环。"""
+        loop = self.loop
+        if loop and not loop.is_closed():
+            loop.call_soon_threadsafe(self.audio_changed_event.set)
+
     def run(self):
         logger.log_info("[COM] 正在初始化...")
         comtypes.CoInitialize()
         try:
             logger.log_info("[COM] 初始化成功。")
+            load_icon_cache()
+            try:
+                prime_pid_exe_cache()
+            except Exception as e:
+                logger.log_warning(f"[图标缓存] 预加载进程路径失败: {e}")
             self.loop = asyncio.new_event_loop()
             asyncio.set_event_loop(self.loop)
             logger.log_info("[后台工作线程] 启动，切换到事件驱动模式")
 
             async def main_logic():
                 self.async_stop_event = asyncio.Event()
+                self.audio_changed_event = asyncio.Event()
                 
-                self.audio_monitor = AudioMonitor()
+                # AudioMonitor 的 COM 对象在音频线程中创建，之后也只在该线程中使用
+                self.audio_monitor = await self.loop.run_in_executor(
+                    self._audio_pool, lambda: AudioMonitor(on_change=self._notify_audio_changed))
                 self.media_controller = MediaController()
                 try:
                     await self.media_controller.initialize()
@@ -382,6 +866,8 @@ class BackgroundWorker:
 
                 event_token = self.media_controller.manager.add_sessions_changed(on_sessions_changed)
                 
+                self.worker_queue.bind(self.loop)
+                queue_task = self.loop.create_task(self._worker_queue_loop())
                 periodic_task = self.loop.create_task(self._periodic_check_loop_async())
 
                 logger.log_info("[后台工作线程] 周期性检查任务已启动，将自动加载会话列表。")
@@ -394,24 +880,39 @@ class BackgroundWorker:
                 except Exception as e:
                     logger.log_warning(f"注销 sessions_changed 事件时出错: {e}")
                 
+                self.worker_queue.unbind()
+                queue_task.cancel()
                 periodic_task.cancel()
-                await asyncio.gather(periodic_task, return_exceptions=True)
+                await asyncio.wait([queue_task, periodic_task], timeout=self.SHUTDOWN_TIMEOUT)
+                await self.loop.run_in_executor(self._audio_pool, self.audio_monitor.close)
 
             self.loop.run_until_complete(main_logic())
 
         finally:
+            # 先保存持久化缓存，之后的清理步骤即使耗时较长或被中断也不会丢失缓存
+            save_executable_details_cache()
+            save_icon_cache()
             logger.log_info("[后台工作线程] 开始关闭asyncio事件循环...")
-            if self.loop and self.loop.is_running():
-                tasks = asyncio.all_tasks(loop=self.loop)
-                for task in tasks:
-                    if not task.done():
-                        task.cancel()
-                group = asyncio.gather(*tasks, return_exceptions=True)
-                self.loop.run_until_complete(group)
+            if self.loop and not self.loop.is_closed():
+                # 取消残留任务，最多等待 SHUTDOWN_TIMEOUT 秒，避免忽略取消的任务阻塞退出
+                pending = [task for task in asyncio.all_tasks(loop=self.loop) if not task.done()]
+                for task in pending:
+                    task.cancel()
+                if pending:
+                    _, still_pending = self.loop.run_until_complete(
+                        asyncio.wait(pending, timeout=self.SHUTDOWN_TIMEOUT))
+                    for task in still_pending:
+                        logger.log_warning(f"[后台工作线程] 任务未能在关闭时及时取消: {task}")
                 self.loop.run_until_complete(self.loop.shutdown_asyncgens())
             
             if self.loop:
                 self.loop.close()
+            # 等待正在进行的提取结束后再释放各线程缓存的DC
+            self._icon_pool.shutdown(wait=True, cancel_futures=True)
+            release_thread_dcs()
+            # 单线程池按提交顺序执行，CoUninitialize 会在音频线程上最后运行
+            self._audio_pool.submit(comtypes.CoUninitialize)
+            self._audio_pool.shutdown(wait=True)
             
             self.loop = None
             logger.log_info("[COM] 正在卸载...")